@@ -0,0 +1,39 @@
+"""
+Fallback prediction service used when app.predictions cannot be imported.
+Only loaded on ImportError so the normal import path stays lean.
+"""
+
+
+class MinimalPredictionService:
+    def predict_workout_performance(self, user_email, workout_type="general"):
+        return None
+
+    def recommend_macro_targets(self, user_email, goal_type="maintenance"):
+        return None
+
+    def generate_intervention_suggestions(self, user_email):
+        return []
+
+    def log_prediction_accuracy(
+        self,
+        user_email,
+        prediction_type,
+        predicted_value,
+        actual_value,
+        prediction_date,
+        actual_date=None,
+    ):
+        # Stub: always return True for testing
+        return True
+
+    def get_prediction_accuracy_stats(self, user_email, prediction_type=""):
+        return {"total_predictions": 0, "average_accuracy": 0.0}
+
+    def calculate_accuracy_trends(self, user_email, prediction_type=""):
+        return {}
+
+    def get_prediction_type_performance(self, user_email):
+        return {}
+
+    def get_recent_prediction_accuracy(self, user_email, days=30, limit=None):
+        return []
@@ -12,6 +12,8 @@ import threading
 import time
 from concurrent.futures import ThreadPoolExecutor, Future
 
+from pydantic_core import to_json
+
 from .db import get_db_connection, AnalyticsDB
 from .models import TrendAnalysis
 
@@ -41,7 +43,8 @@ class BackgroundTaskManager:
     def __init__(self, max_workers: int = 2):
         self.executor = ThreadPoolExecutor(max_workers=max_workers)
         self.active_tasks: Dict[str, Future] = {}
-        self.task_results: Dict[str, Any] = {}
+        # Completed results are kept pre-serialized as JSON bytes
+        self.task_results: Dict[str, bytes] = {}
         self._lock = threading.Lock()
 
     def submit_task(self, task_id: str, func, *args, **kwargs) -> bool:
@@ -50,10 +53,27 @@ class BackgroundTaskManager:
             if task_id in self.active_tasks and not self.active_tasks[task_id].done():
                 return False  # Task already running
 
-            future = self.executor.submit(func, *args, **kwargs)
+            self.task_results.pop(task_id, None)
+            future = self.executor.submit(
+                self._run_task, task_id, func, *args, **kwargs
+            )
             self.active_tasks[task_id] = future
             return True
 
+    def _run_task(self, task_id: str, func, *args, **kwargs):
+        """
+        Run func in the worker and store its JSON encoding before the future
+        completes, so a "completed" status always has the result ready.
+        Encoding happens outside the lock; empty results are not stored, so
+        they read back as missing.
+        """
+        result = func(*args, **kwargs)
+        if result:
+            encoded = to_json(result)
+            with self._lock:
+                self.task_results[task_id] = encoded
+        return result
+
     def get_task_status(self, task_id: str) -> Dict[str, Any]:
         """Get status of a background task"""
         with self._lock:
@@ -65,14 +85,12 @@ class BackgroundTaskManager:
                 if future.exception():
                     return {"status": "error", "error": str(future.exception())}
                 else:
-                    result = future.result()
-                    self.task_results[task_id] = result
-                    return {"status": "completed", "result": result}
+                    return {"status": "completed", "result": future.result()}
             else:
                 return {"status": "running"}
 
-    def get_task_result(self, task_id: str) -> Optional[Any]:
-        """Get result of completed task"""
+    def get_task_result(self, task_id: str) -> Optional[bytes]:
+        """Get JSON-encoded result of completed task"""
         with self._lock:
             return self.task_results.get(task_id)
 
@@ -92,6 +110,13 @@ class BackgroundTaskManager:
                     pass
 
 
+# Expired cache rows are pruned this often, keeping analytics_cache small
+CLEANUP_INTERVAL_SECONDS = 300
+# Completed background tasks, whose results /analytics/background/result
+# serves, are only dropped this often
+TASK_CLEANUP_INTERVAL_SECONDS = 3600
+
+
 class AnalyticsService:
     """Core analytics service for trend analysis and statistical calculations"""
 
@@ -104,16 +129,20 @@ class AnalyticsService:
         """Start background cleanup thread for cache and task management"""
 
         def cleanup_worker():
+            next_task_cleanup = time.monotonic() + TASK_CLEANUP_INTERVAL_SECONDS
             while True:
                 try:
                     # Clean up expired cache entries
                     self.analytics_db.clear_expired_cache()
 
-                    # Clean up completed background tasks
-                    self.background_manager.cleanup_completed_tasks()
+                    # Clean up completed background tasks, on their own cadence
+                    if time.monotonic() >= next_task_cleanup:
+                        self.background_manager.cleanup_completed_tasks()
+                        next_task_cleanup = (
+                            time.monotonic() + TASK_CLEANUP_INTERVAL_SECONDS
+                        )
 
-                    # Sleep for 1 hour before next cleanup
-                    time.sleep(3600)
+                    time.sleep(CLEANUP_INTERVAL_SECONDS)
                 except Exception:
                     time.sleep(300)  # Sleep 5 minutes on error
 
@@ -160,8 +189,8 @@ class AnalyticsService:
         """Get status of background analysis task"""
         return self.background_manager.get_task_status(task_id)
 
-    def get_background_task_result(self, task_id: str) -> Optional[Any]:
-        """Get result of completed background task"""
+    def get_background_task_result(self, task_id: str) -> Optional[bytes]:
+        """Get JSON-encoded result of completed background task"""
         return self.background_manager.get_task_result(task_id)
 
     def _comprehensive_correlation_analysis(
@@ -9,9 +9,11 @@ from __future__ import annotations
 import json
 import os
 import sqlite3
+import time
+import zlib
 from contextlib import contextmanager
-from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
 
 # ---- Configuration -----------------------------------------------------------
 
@@ -35,6 +37,8 @@ def _connect() -> sqlite3.Connection:
         DATABASE_PATH,
         check_same_thread=False,  # allow use across FastAPI/TestClient threads
         detect_types=sqlite3.PARSE_DECLTYPES,
+        # "file:" URIs allow shared in-memory databases (used by the tests)
+        uri=DATABASE_PATH.startswith("file:"),
     )
     conn.row_factory = sqlite3.Row
 
@@ -43,6 +47,8 @@ def _connect() -> sqlite3.Connection:
     conn.execute("PRAGMA foreign_keys = ON;")
     conn.execute("PRAGMA journal_mode = WAL;")
     conn.execute("PRAGMA synchronous = NORMAL;")
+    # Keep sort/GROUP BY scratch space off disk
+    conn.execute("PRAGMA temp_store = MEMORY;")
     return conn
 
 
@@ -70,6 +76,42 @@ def _utc_now_iso() -> str:
     return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
 
 
+# (local midnight timestamp at which the cached value goes stale, ISO date)
+_today_cache = (0.0, "")
+
+
+def today_iso() -> str:
+    """Local date as YYYY-MM-DD, formatted once per day rather than per call."""
+    global _today_cache
+    expires_at, value = _today_cache
+    if time.time() < expires_at:
+        return value
+    today = date.today()
+    tomorrow = datetime.combine(today + timedelta(days=1), datetime.min.time())
+    value = today.isoformat()
+    _today_cache = (tomorrow.timestamp(), value)
+    return value
+
+
+# Cached analysis results are stored as zlib-compressed compact JSON.
+# Level 1 is nearly as small as the default for these payloads, at a
+# fraction of the CPU.
+_PACK_LEVEL = 1
+
+
+def _pack(obj: Any) -> bytes:
+    return zlib.compress(
+        json.dumps(obj, separators=(",", ":")).encode("utf-8"), _PACK_LEVEL
+    )
+
+
+def _unpack(data: Any) -> Any:
+    # Rows written before compression hold plain JSON text
+    if isinstance(data, str):
+        return json.loads(data)
+    return json.loads(zlib.decompress(data))
+
+
 # ---- Analytics operations ----------------------------------------------------
 
 
@@ -110,7 +152,7 @@ class AnalyticsDB:
                         user_email,
                         analysis_type,
                         time_period,
-                        json.dumps(result_data, separators=(",", ":")),
+                        sqlite3.Binary(_pack(result_data)),
                         expires_at,
                         confidence_level,
                     ),
@@ -147,17 +189,59 @@ class AnalyticsDB:
                 if not row:
                     return None
                 return {
-                    "result_data": json.loads(row["result_data"]),
+                    "result_data": _unpack(row["result_data"]),
                     "confidence_level": row["confidence_level"],
                     "cached_at": row["created_at"],
                 }
         except Exception:
             return None
 
+    @staticmethod
+    def get_many_cached(
+        user_email: str,
+        keys: List[Tuple[str, int]],
+    ) -> Dict[Tuple[str, int], Dict[str, Any]]:
+        """
+        Batched get_cached_analysis: look up several (analysis_type, time_period)
+        pairs in one query. Returns only the hits, keyed by pair ({} on error).
+        """
+        if not keys:
+            return {}
+        try:
+            with get_db_connection() as conn:
+                pairs = " OR ".join(
+                    "(analysis_type = ? AND time_period = ?)" for _ in keys
+                )
+                params: List[Any] = [user_email]
+                for analysis_type, time_period in keys:
+                    params.extend((analysis_type, time_period))
+                cur = conn.execute(
+                    f"""
+                    SELECT analysis_type, time_period, result_data,
+                           confidence_level, created_at
+                    FROM analytics_cache
+                    WHERE user_email = ?
+                      AND ({pairs})
+                      AND expires_at > CURRENT_TIMESTAMP
+                    """,
+                    params,
+                )
+                return {
+                    (row["analysis_type"], row["time_period"]): {
+                        "result_data": _unpack(row["result_data"]),
+                        "confidence_level": row["confidence_level"],
+                        "cached_at": row["created_at"],
+                    }
+                    for row in cur.fetchall()
+                }
+        except Exception:
+            return {}
+
     @staticmethod
     def clear_expired_cache() -> int:
         """
-        Remove expired cache entries.
+        Remove expired cache entries and hand the freed pages back to the OS
+        (a no-op unless the database uses auto_vacuum=INCREMENTAL).
         Returns count of removed rows (0 on error).
         """
         try:
@@ -166,7 +250,11 @@ class AnalyticsDB:
                     "DELETE FROM analytics_cache WHERE expires_at <= CURRENT_TIMESTAMP"
                 )
                 conn.commit()
-                return cur.rowcount or 0
+                removed = cur.rowcount or 0
+                if removed:
+                    # Each step frees pages; fetchall() runs it to completion
+                    conn.execute("PRAGMA incremental_vacuum").fetchall()
+                return removed
         except Exception:
             return 0
 
@@ -276,11 +364,13 @@ class AnalyticsDB:
         """
         Invalidate cached analysis results for a user.
         If analysis_types is None, invalidates all cache entries for the user.
+        Always a single DELETE, however many types are given.
         Returns number of deleted rows (0 on error).
         """
         try:
             with get_db_connection() as conn:
                 if analysis_types:
+                    analysis_types = list(dict.fromkeys(analysis_types))
                     placeholders = ",".join("?" for _ in analysis_types)
                     query = f"""
                         DELETE FROM analytics_cache
@@ -0,0 +1,108 @@
+"""
+Long-lived SQLite connections for the request-path queries (app.queries).
+- N reader connections, reused LIFO so the warmest page cache is handed out first
+- a single writer connection, serialized with a lock (SQLite has one writer anyway)
+Pragmas are applied once per connection, at open.
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+DB_NAME = "data/ascend.db"
+
+READ_POOL_SIZE = os.cpu_count() or 4
+# Map up to 256 MiB of the database file so reads skip the pread() copy
+MMAP_SIZE = 256 * 1024 * 1024
+
+_readers: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(
+    maxsize=READ_POOL_SIZE
+)
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def _open():
+    # Autocommit mode: the driver never injects its own BEGIN, reads run
+    # outside any transaction, and writes are bracketed by get_write_conn().
+    # A larger statement cache keeps every hot query compiled per connection.
+    conn = sqlite3.connect(
+        DB_NAME, check_same_thread=False, cached_statements=256, isolation_level=None
+    )
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode = WAL;")
+    conn.execute("PRAGMA synchronous = NORMAL;")
+    conn.execute("PRAGMA temp_store = MEMORY;")
+    conn.execute("PRAGMA cache_size = -64000;")
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE};")
+    return conn
+
+
+@contextmanager
+def get_read_conn():
+    """
+    Borrow a reader connection.
+    Usage:
+        with get_read_conn() as conn:
+            rows = conn.execute(...).fetchall()
+    Connections are opened lazily and run in autocommit mode; a transaction
+    left open by the caller is rolled back on return.
+    """
+    try:
+        conn = _readers.get_nowait()
+    except queue.Empty:
+        conn = _open()
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        try:
+            _readers.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+@contextmanager
+def get_write_conn():
+    """
+    Hold the writer connection for the duration of the block, inside one
+    explicit BEGIN IMMEDIATE ... COMMIT.
+    Usage:
+        with get_write_conn() as conn:
+            conn.execute("INSERT ...")
+    Rolls back instead if the block raises.
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = _open()
+        conn = _writer
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+
+
+def close_all():
+    """
+    Close every pooled connection (call at shutdown). Closing the last one
+    checkpoints the WAL, so the -wal/-shm files don't outlive the process.
+    """
+    global _writer
+    while True:
+        try:
+            _readers.get_nowait().close()
+        except queue.Empty:
+            break
+    with _writer_lock:
+        if _writer is not None:
+            _writer.close()
+            _writer = None
@@ -1,23 +1,33 @@
-from datetime import datetime, date
+import itertools
+import os
+from datetime import datetime
 from typing import Optional, List
 
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, BackgroundTasks, Depends, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+
+from fastapi.concurrency import run_in_threadpool
 
 from app.auth import (
     create_access_token,
-    verify_password,
+    hash_password_async,
     get_current_user,
 )
 from app.models import (
     UserCreate,
     UserLogin,
     Food,
+    FoodOut,
     ExerciseLog,
     Workout,
+    WeightEntry,
+    TrendAnalysis,
 )
-from app import queries
+from app import db_pool, queries
+from app.db import AnalyticsDB, today_iso
 
 app = FastAPI()
 
@@ -30,24 +40,41 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ---------- Threadpool ----------
+# Sync (def) handlers run on AnyIO's worker threads; the default cap of 40
+# becomes the concurrency ceiling for every DB-backed endpoint.
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "40"))
+
+
+@app.on_event("startup")
+async def configure_threadpool():
+    from anyio import to_thread
+
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+
+
+@app.on_event("shutdown")
+def close_db_pool():
+    db_pool.close_all()
+
 
 # ---------- Public ----------
 @app.get("/")
-def root():
+async def root():
     return {"message": "Ascend API is running"}
 
 
 @app.post("/create_user")
-def create_user(user: UserCreate):
-    if not queries.create_user(user.email, user.password):
+async def create_user(user: UserCreate):
+    hashed_pw = await hash_password_async(user.password)
+    if not await run_in_threadpool(queries.create_user, user.email, hashed_pw):
         raise HTTPException(status_code=400, detail="Email already in use")
     return {"message": "User created successfully"}
 
 
 @app.post("/login")
-def login(user: UserLogin):
-    row = queries.get_user_by_email(user.email)
-    if not row or not verify_password(user.password, row["password"]):
+async def login(user: UserLogin):
+    if not await queries.login_user(user.email, user.password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     token = create_access_token({"sub": user.email})
@@ -58,22 +85,81 @@ def login(user: UserLogin):
 CurrentUser = Depends(get_current_user)
 
 
+# ---------- Conditional GET helpers ----------
+def _list_etag(table: str, user_email: str) -> str:
+    count, max_rowid = queries.get_list_version(table, user_email)
+    return f'W/"{count}-{max_rowid}"'
+
+
+def _not_modified(request: Request, etag: str) -> Optional[Response]:
+    """304 response if the client already holds this version, else None"""
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
+
+
 # ---------- Foods ----------
 @app.post("/foods")
-def create_food(food: Food, user_email: str = CurrentUser):
-    queries.insert_food(food, user_email)
+def create_food(food: Food, background: BackgroundTasks, user_email: str = CurrentUser):
+    new_id = queries.insert_food(food, user_email)
+
+    # Invalidate nutrition-related analytics cache after the response is sent
+    background.add_task(
+        AnalyticsDB.invalidate_user_cache, user_email, ["macro_patterns"]
+    )
+
+    return {"message": "Food entry created", "id": new_id}
+
+
+# Built once: validates and serializes food lists in pydantic-core
+_FOODS_ADAPTER = TypeAdapter(List[FoodOut])
 
-    # Invalidate nutrition-related analytics cache
-    from app.db import AnalyticsDB
 
-    AnalyticsDB.invalidate_user_cache(user_email, ["macro_patterns"])
+def _dump_foods(batch: List[dict]) -> bytes:
+    return _FOODS_ADAPTER.dump_json(_FOODS_ADAPTER.validate_python(batch))
 
-    return {"message": "Food entry created"}
 
+def _stream_json_array(head: bytes, batches, dump):
+    """Yield head (an open JSON array), then each batch's elements and "]" """
+    yield head
+    for batch in batches:
+        # dump gives "[...]"; keep only the elements between the brackets
+        yield b"," + dump(batch)[1:-1]
+    yield b"]"
 
-@app.get("/foods")
-def list_foods(user_email: str = CurrentUser):
-    return queries.get_foods_by_user(user_email)
+
+def _json_array_response(batches, headers: dict, dump=to_json) -> Response:
+    """
+    JSON array of every row in batches. The first batch is encoded before
+    the status line goes out, so an encoding error there is a plain 500;
+    a list that fits in one batch is sent whole, without streaming.
+    """
+    try:
+        first = dump(next(batches, []))
+        second = next(batches, None)
+    except BaseException:
+        batches.close()  # release the pooled read connection
+        raise
+
+    if second is None:
+        return Response(first, media_type="application/json", headers=headers)
+    return StreamingResponse(
+        _stream_json_array(first[:-1], itertools.chain((second,), batches), dump),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+@app.get("/foods", response_model=List[FoodOut])
+def list_foods(request: Request, user_email: str = CurrentUser):
+    etag = _list_etag("foods", user_email)
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+
+    return _json_array_response(
+        queries.iter_foods_by_user(user_email), {"ETag": etag}, _dump_foods
+    )
 
 
 @app.delete("/foods/{food_id}")
@@ -84,28 +170,31 @@ def delete_food(food_id: int, user_email: str = CurrentUser):
 
 # ---------- Daily macros ----------
 @app.get("/daily_macros")
-def daily_macros(user_email: str = CurrentUser):
+async def daily_macros(user_email: str = CurrentUser):
     """Return summed calories/protein/carbs/fat for *today*."""
-    return queries.get_macros_for_user_today(user_email, date.today().isoformat())
+    iso_date = today_iso()
+    # Cache hits are answered on the event loop; only misses need a thread
+    cached = queries.peek_macros(user_email, iso_date)
+    if cached is not None:
+        return cached
+    return await run_in_threadpool(
+        queries.get_macros_for_user_today, user_email, iso_date
+    )
 
 
 # ---------- Weights ----------
-from pydantic import BaseModel
-
-
-class WeightEntry(BaseModel):
-    date: str
-    weight: float
-
-
 @app.post("/weights")
-def add_weight(entry: WeightEntry, user_email: str = CurrentUser):
-    queries.insert_weight(user_email, entry.date, entry.weight)
-
-    # Invalidate weight-related analytics cache
-    from app.db import AnalyticsDB
+def add_weight(
+    entry: WeightEntry, background: BackgroundTasks, user_email: str = CurrentUser
+):
+    queries.insert_weight(user_email, entry.date.isoformat(), entry.weight)
 
-    AnalyticsDB.invalidate_user_cache(user_email, ["weight_trends", "macro_patterns"])
+    # Invalidate weight-related analytics cache after the response is sent
+    background.add_task(
+        AnalyticsDB.invalidate_user_cache,
+        user_email,
+        ["weight_trends", "macro_patterns"],
+    )
 
     return {"message": "Weight logged"}
 
@@ -113,43 +202,52 @@ def add_weight(entry: WeightEntry, user_email: str = CurrentUser):
 # ---------- Summary (kept for compatibility) ----------
 @app.get("/summary")
 def get_summary(user_email: str = CurrentUser):
-    today = datetime.today().strftime("%Y-%m-%d")
-    return queries.get_summary(user_email, today)
+    return queries.get_summary(user_email, today_iso())
 
 
 # ---------- Exercise / Workouts ----------
 @app.post("/exercise_logs")
-def create_exercise_log(log: ExerciseLog, user_email: str = CurrentUser):
-    queries_log = queries.ExerciseLog(**log.dict())
-    queries.insert_exercise_log(user_email, queries_log)
-
-    # Invalidate performance-related analytics cache
-    from app.db import AnalyticsDB
+def create_exercise_log(
+    log: ExerciseLog, background: BackgroundTasks, user_email: str = CurrentUser
+):
+    new_id = queries.insert_exercise_log(user_email, log)
 
-    AnalyticsDB.invalidate_user_cache(
-        user_email, ["performance_predictions", "correlations"]
+    # Invalidate performance-related analytics cache after the response is sent
+    background.add_task(
+        AnalyticsDB.invalidate_user_cache,
+        user_email,
+        ["performance_predictions", "correlations"],
     )
 
-    return {"message": "Exercise log added"}
+    return {"message": "Exercise log added", "id": new_id}
 
 
 @app.post("/workouts")
-def create_workout(workout: Workout, user_email: str = CurrentUser):
-    queries.insert_workout(user_email, workout)
-
-    # Invalidate performance-related analytics cache
-    from app.db import AnalyticsDB
+def create_workout(
+    workout: Workout, background: BackgroundTasks, user_email: str = CurrentUser
+):
+    new_id = queries.insert_workout(user_email, workout)
 
-    AnalyticsDB.invalidate_user_cache(
-        user_email, ["performance_predictions", "correlations"]
+    # Invalidate performance-related analytics cache after the response is sent
+    background.add_task(
+        AnalyticsDB.invalidate_user_cache,
+        user_email,
+        ["performance_predictions", "correlations"],
     )
 
-    return {"message": "Workout added"}
+    return {"message": "Workout added", "id": new_id}
 
 
 @app.get("/workouts")
-def list_workouts(user_email: str = CurrentUser):
-    return queries.get_workouts_by_user(user_email)
+def list_workouts(request: Request, user_email: str = CurrentUser):
+    etag = _list_etag("workouts", user_email)
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+
+    return _json_array_response(
+        queries.iter_workouts_by_user(user_email), {"ETag": etag}
+    )
 
 
 # ---------- Analytics Endpoints ----------
@@ -163,40 +261,8 @@ try:
 
     prediction_service = PredictionService()
 except ImportError:
-    # Create a minimal prediction service for testing
-    class MinimalPredictionService:
-        def predict_workout_performance(self, user_email, workout_type="general"):
-            return None
-
-        def recommend_macro_targets(self, user_email, goal_type="maintenance"):
-            return None
-
-        def generate_intervention_suggestions(self, user_email):
-            return []
-
-        def log_prediction_accuracy(
-            self,
-            user_email,
-            prediction_type,
-            predicted_value,
-            actual_value,
-            prediction_date,
-            actual_date=None,
-        ):
-            # Stub: always return True for testing
-            return True
-
-        def get_prediction_accuracy_stats(self, user_email, prediction_type=""):
-            return {"total_predictions": 0, "average_accuracy": 0.0}
-
-        def calculate_accuracy_trends(self, user_email, prediction_type=""):
-            return {}
-
-        def get_prediction_type_performance(self, user_email):
-            return {}
-
-        def get_recent_prediction_accuracy(self, user_email, days=30):
-            return []
+    # Fall back to a minimal prediction service (testing only)
+    from app._prediction_stub import MinimalPredictionService
 
     prediction_service = MinimalPredictionService()
 
@@ -369,9 +435,23 @@ def get_analytics_recommendations(
 def get_analytics_insights(days: int = 30, user_email: str = CurrentUser):
     """Get comprehensive analytics dashboard data"""
     try:
-        # Get all analytics components with specified time period
-        weight_trends = analytics_service.calculate_weight_trends(user_email, days)
-        macro_trends = analytics_service.analyze_macro_patterns(user_email, days)
+        # Read the cached trend components in one query; recompute only misses
+        cached = AnalyticsDB.get_many_cached(
+            user_email, [("weight_trends", days), ("macro_patterns", days)]
+        )
+        weight_hit = cached.get(("weight_trends", days))
+        macro_hit = cached.get(("macro_patterns", days))
+
+        weight_trends = (
+            TrendAnalysis(**weight_hit["result_data"])
+            if weight_hit
+            else analytics_service.calculate_weight_trends(user_email, days)
+        )
+        macro_trends = (
+            {k: TrendAnalysis(**v) for k, v in macro_hit["result_data"].items()}
+            if macro_hit
+            else analytics_service.analyze_macro_patterns(user_email, days)
+        )
         correlations = analytics_service.correlate_nutrition_performance(
             user_email, min(days * 2, 90)
         )
@@ -466,6 +546,37 @@ def get_analytics_insights(days: int = 30, user_email: str = CurrentUser):
         )
 
 
+def _bundle_part(result) -> bytes:
+    """One bundle entry: the endpoint's status code and its JSON body as-is"""
+    if isinstance(result, Response):
+        status, body = result.status_code, result.body
+    else:
+        status, body = 200, to_json(result)
+    return b'{"status":%d,"body":%s}' % (status, body)
+
+
+@app.get("/analytics/bundle")
+def get_analytics_bundle(
+    days: int = 30,
+    workout_type: str = "general",
+    goal_type: str = "maintenance",
+    user_email: str = CurrentUser,
+):
+    """
+    Trends, predictions, recommendations and insights in one round trip.
+    Each entry carries the status code the standalone endpoint would have
+    returned. Trends run first, so insights reads them back from the cache.
+    """
+    parts = (
+        ("trends", get_analytics_trends(days, user_email)),
+        ("predictions", get_analytics_predictions(workout_type, user_email)),
+        ("recommendations", get_analytics_recommendations(goal_type, user_email)),
+        ("insights", get_analytics_insights(days, user_email)),
+    )
+    body = b",".join(b'"%s":%s' % (name.encode(), _bundle_part(r)) for name, r in parts)
+    return Response(b"{" + body + b"}", media_type="application/json")
+
+
 def _calculate_data_quality_score(
     weight_trends, macro_trends, correlations, performance_prediction
 ) -> float:
@@ -590,6 +701,18 @@ def get_background_analysis_status(task_id: str, user_email: str = CurrentUser):
         )
 
 
+RESULT_CHUNK_SIZE = 64 * 1024
+
+
+def _iter_json_chunks(head: bytes, body: bytes, tail: bytes):
+    """Yield a JSON document as head + body (in fixed-size slices) + tail"""
+    yield head
+    view = memoryview(body)
+    for start in range(0, len(view), RESULT_CHUNK_SIZE):
+        yield bytes(view[start : start + RESULT_CHUNK_SIZE])
+    yield tail
+
+
 @app.get("/analytics/background/result/{task_id}")
 def get_background_analysis_result(task_id: str, user_email: str = CurrentUser):
     """Get result of completed background analysis task"""
@@ -643,12 +766,12 @@ def get_background_analysis_result(task_id: str, user_email: str = CurrentUser):
                 },
             )
 
-        return {
-            "task_id": task_id,
-            "status": "completed",
-            "result": result,
-            "retrieved_at": datetime.now().isoformat(),
-        }
+        # Wrap the stored, already-encoded result instead of re-serializing it
+        head = b'{"task_id":' + to_json(task_id) + b',"status":"completed","result":'
+        tail = b',"retrieved_at":' + to_json(datetime.now().isoformat()) + b"}"
+        return StreamingResponse(
+            _iter_json_chunks(head, result, tail), media_type="application/json"
+        )
 
     except Exception as e:
         return JSONResponse(
@@ -665,8 +788,6 @@ def get_background_analysis_result(task_id: str, user_email: str = CurrentUser):
 def get_cache_statistics(user_email: str = CurrentUser):
     """Get analytics cache statistics for monitoring"""
     try:
-        from app.db import AnalyticsDB
-
         stats = AnalyticsDB.get_cache_stats()
 
         return {"cache_statistics": stats, "generated_at": datetime.now().isoformat()}
@@ -688,8 +809,6 @@ def clear_user_cache(
 ):
     """Clear analytics cache for current user"""
     try:
-        from app.db import AnalyticsDB
-
         cleared_count = AnalyticsDB.invalidate_user_cache(
             user_email, analysis_types or []
         )
@@ -712,6 +831,20 @@ def clear_user_cache(
         )
 
 
+def _accuracy_extremes(type_performance):
+    """Return (most, least) accurate prediction types in a single pass"""
+    best_type = worst_type = None
+    best = float("-inf")
+    worst = float("inf")
+    for prediction_type, stats in type_performance.items():
+        accuracy = stats["average_accuracy"]
+        if accuracy > best:
+            best, best_type = accuracy, prediction_type
+        if accuracy < worst:
+            worst, worst_type = accuracy, prediction_type
+    return best_type, worst_type
+
+
 @app.get("/analytics/accuracy")
 def get_prediction_accuracy_metrics(
     prediction_type: Optional[str] = None, user_email: str = CurrentUser
@@ -735,9 +868,9 @@ def get_prediction_accuracy_metrics(
             user_email
         )
 
-        # Get recent accuracy records
+        # Get the 10 most recent accuracy records
         recent_records = prediction_service.get_recent_prediction_accuracy(
-            user_email, days=30
+            user_email, days=30, limit=10
         )
 
         if accuracy_stats["total_predictions"] == 0:
@@ -754,27 +887,19 @@ def get_prediction_accuracy_metrics(
                 },
             )
 
+        most_accurate_type, least_accurate_type = _accuracy_extremes(type_performance)
+
         return {
             "accuracy_statistics": accuracy_stats,
             "accuracy_trends": accuracy_trends,
             "performance_by_type": type_performance,
-            "recent_records": recent_records[:10],  # Limit to 10 most recent
+            "recent_records": recent_records,
             "analysis_summary": {
                 "total_predictions_tracked": accuracy_stats["total_predictions"],
                 "overall_accuracy": accuracy_stats["average_accuracy"],
                 "trend_direction": accuracy_trends.get("trend", "unknown"),
-                "most_accurate_type": max(
-                    type_performance.keys(),
-                    key=lambda k: type_performance[k]["average_accuracy"],
-                )
-                if type_performance
-                else None,
-                "least_accurate_type": min(
-                    type_performance.keys(),
-                    key=lambda k: type_performance[k]["average_accuracy"],
-                )
-                if type_performance
-                else None,
+                "most_accurate_type": most_accurate_type,
+                "least_accurate_type": least_accurate_type,
             },
             "generated_at": datetime.now().isoformat(),
         }
@@ -798,6 +923,17 @@ def get_prediction_accuracy_metrics(
         )
 
 
+try:
+    from ciso8601 import parse_datetime as _parse_iso_datetime
+except ImportError:  # optional C parser; fall back to the stdlib
+
+    def _parse_iso_datetime(value: str) -> datetime:
+        """Parse an ISO-8601 timestamp, accepting a trailing 'Z' for UTC"""
+        if value.endswith("Z"):
+            value = value[:-1] + "+00:00"
+        return datetime.fromisoformat(value)
+
+
 @app.post("/analytics/accuracy/log")
 def log_prediction_accuracy(
     prediction_type: str,
@@ -828,9 +964,9 @@ def log_prediction_accuracy(
 
         # Validate dates
         try:
-            datetime.fromisoformat(prediction_date.replace("Z", "+00:00"))
+            _parse_iso_datetime(prediction_date)
             if actual_date:
-                datetime.fromisoformat(actual_date.replace("Z", "+00:00"))
+                _parse_iso_datetime(actual_date)
         except ValueError as e:
             return JSONResponse(
                 status_code=400,
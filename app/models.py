@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import Dict, List, Any
+from datetime import date
+from pydantic import BaseModel, ConfigDict
+from typing import Any, Optional
 
 
 class UserCreate(BaseModel):
@@ -22,6 +23,20 @@ class Food(BaseModel):
     sugar: float
 
 
+class FoodOut(BaseModel):
+    # A stored foods row, in column order. The schema allows NULL macros
+    # (rows written before request validation), so they are optional here.
+    id: int
+    name: str
+    calories: Optional[float]
+    protein: Optional[float]
+    carbs: Optional[float]
+    fat: Optional[float]
+    fiber: Optional[float]
+    sugar: Optional[float]
+    user_email: str
+
+
 class Meal(BaseModel):
     user_id: int
     timestamp: str  # ISO format
@@ -41,10 +56,21 @@ class Workout(BaseModel):
     name: str
 
 
+class WeightEntry(BaseModel):
+    date: date  # parsed from YYYY-MM-DD once, at validation
+    weight: float
+
+
 # Analytics Data Models
 
+# Analytics models are output-only: frozen (no setattr hooks) and strict about
+# unknown keys so cached payloads that drift from the schema fail loudly.
+_ANALYTICS_CONFIG = ConfigDict(frozen=True, extra="forbid")
+
 
 class TrendAnalysis(BaseModel):
+    model_config = _ANALYTICS_CONFIG
+
     metric_name: str
     time_period: int  # days
     trend_direction: str  # "increasing", "decreasing", "stable"
@@ -56,15 +82,19 @@ class TrendAnalysis(BaseModel):
 
 
 class PerformancePrediction(BaseModel):
+    model_config = _ANALYTICS_CONFIG
+
     workout_type: str
-    predicted_performance: Dict[str, float]  # {"reps": 12, "weight": 185}
-    confidence_interval: Dict[str, float]  # {"lower": 0.8, "upper": 1.2}
-    factors_considered: List[str]
+    predicted_performance: dict[str, float]  # {"reps": 12, "weight": 185}
+    confidence_interval: dict[str, float]  # {"lower": 0.8, "upper": 1.2}
+    factors_considered: list[str]
     prediction_date: str
     confidence_score: float
 
 
 class NutritionRecommendation(BaseModel):
+    model_config = _ANALYTICS_CONFIG
+
     target_calories: float
     target_protein: float
     target_carbs: float
@@ -76,25 +106,31 @@ class NutritionRecommendation(BaseModel):
 
 
 class AnalysisResult(BaseModel):
+    model_config = _ANALYTICS_CONFIG
+
     user_email: str
     analysis_type: str
     time_period: int
-    result_data: Dict[str, Any]
+    result_data: dict[str, Any]
     created_at: str
     expires_at: str
     confidence_level: float
 
 
 class TrendInsight(BaseModel):
+    model_config = _ANALYTICS_CONFIG
+
     insight_type: str  # "weight_trend", "macro_pattern", "performance_correlation"
     title: str
     description: str
     significance_level: float
-    actionable_recommendations: List[str]
-    data_period: Dict[str, str]  # {"start": "2024-01-01", "end": "2024-01-31"}
+    actionable_recommendations: list[str]
+    data_period: dict[str, str]  # {"start": "2024-01-01", "end": "2024-01-31"}
 
 
 class PredictionAccuracy(BaseModel):
+    model_config = _ANALYTICS_CONFIG
+
     prediction_type: str
     predicted_value: float
     actual_value: float
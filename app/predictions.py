@@ -1,7 +1,10 @@
+import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 from app.db import AnalyticsDB
 
+log = logging.getLogger("ascend.predictions")
+
 
 class PredictionService:
     def __init__(self):
@@ -72,7 +75,7 @@ class PredictionService:
         )
 
     def get_recent_prediction_accuracy(
-        self, user_email: str, days: int = 30
+        self, user_email: str, days: int = 30, limit: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
         Get recent prediction accuracy records for analysis
@@ -80,6 +83,7 @@ class PredictionService:
         Args:
             user_email: User identifier
             days: Number of days to look back
+            limit: Maximum number of records to return (optional, newest first)
 
         Returns:
             List of recent accuracy records
@@ -89,38 +93,28 @@ class PredictionService:
 
             cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
 
-            with get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    """
-                    SELECT prediction_type, predicted_value, actual_value, 
-                           accuracy_score, prediction_date, actual_date
-                    FROM prediction_accuracy 
-                    WHERE user_email = ? AND actual_date >= ?
-                    ORDER BY actual_date DESC
-                """,
-                    (user_email, cutoff_date),
-                )
+            query = """
+                SELECT prediction_type, predicted_value, actual_value, 
+                       accuracy_score, prediction_date, actual_date,
+                       ABS(predicted_value - actual_value) AS error_magnitude
+                FROM prediction_accuracy 
+                WHERE user_email = ? AND actual_date >= ?
+                ORDER BY actual_date DESC
+            """
+            params: List[Any] = [user_email, cutoff_date]
 
-                records = []
-                for row in cursor.fetchall():
-                    records.append(
-                        {
-                            "prediction_type": row["prediction_type"],
-                            "predicted_value": row["predicted_value"],
-                            "actual_value": row["actual_value"],
-                            "accuracy_score": row["accuracy_score"],
-                            "prediction_date": row["prediction_date"],
-                            "actual_date": row["actual_date"],
-                            "error_magnitude": abs(
-                                row["predicted_value"] - row["actual_value"]
-                            ),
-                        }
-                    )
+            if limit is not None:
+                query += " LIMIT ?"
+                params.append(limit)
 
-                return records
+            with get_db_connection() as conn:
+                cursor = conn.execute(query, params)
+                return [dict(row) for row in cursor.fetchall()]
 
         except Exception:
+            log.exception(
+                "Failed to load recent prediction accuracy for %s", user_email
+            )
             return []
 
     def calculate_accuracy_trends(
@@ -142,25 +136,43 @@ class PredictionService:
             with get_db_connection() as conn:
                 cursor = conn.cursor()
 
-                # Get accuracy over time
-                query = """
-                    SELECT 
-                        DATE(actual_date) as date,
-                        AVG(accuracy_score) as daily_accuracy,
-                        COUNT(*) as predictions_count
-                    FROM prediction_accuracy 
-                    WHERE user_email = ?
-                """
+                # Get accuracy over time, with the recent (last 7 days) and
+                # older (days 8-14) averages computed by window aggregates
+                where = "WHERE user_email = ?"
                 params = [user_email]
 
                 if prediction_type:
-                    query += " AND prediction_type = ?"
+                    where += " AND prediction_type = ?"
                     params.append(prediction_type)
 
-                query += """
-                    GROUP BY DATE(actual_date)
-                    ORDER BY date DESC
-                    LIMIT 30
+                query = f"""
+                    WITH daily AS (
+                        SELECT 
+                            DATE(actual_date) as date,
+                            AVG(accuracy_score) as daily_accuracy,
+                            COUNT(*) as predictions_count
+                        FROM prediction_accuracy 
+                        {where}
+                        GROUP BY DATE(actual_date)
+                        ORDER BY date DESC
+                        LIMIT 30
+                    ),
+                    ranked AS (
+                        SELECT *, ROW_NUMBER() OVER (ORDER BY date DESC) as rn
+                        FROM daily
+                    )
+                    SELECT 
+                        date, daily_accuracy, predictions_count,
+                        AVG(CASE WHEN rn <= 7 THEN daily_accuracy END) OVER ()
+                            as recent_avg,
+                        COUNT(CASE WHEN rn <= 7 THEN 1 END) OVER () as recent_days,
+                        AVG(CASE WHEN rn BETWEEN 8 AND 14 THEN daily_accuracy END)
+                            OVER () as older_avg,
+                        COUNT(CASE WHEN rn BETWEEN 8 AND 14 THEN 1 END) OVER ()
+                            as older_days,
+                        SUM(predictions_count) OVER () as total_predictions
+                    FROM ranked
+                    ORDER BY rn
                 """
 
                 cursor.execute(query, params)
@@ -172,14 +184,13 @@ class PredictionService:
                         "message": "Not enough prediction accuracy data for trend analysis",
                     }
 
-                # Calculate trend direction
-                recent_accuracy = [row["daily_accuracy"] for row in daily_accuracy[:7]]
-                older_accuracy = [row["daily_accuracy"] for row in daily_accuracy[7:14]]
-
-                if len(recent_accuracy) >= 3 and len(older_accuracy) >= 3:
-                    recent_avg = sum(recent_accuracy) / len(recent_accuracy)
-                    older_avg = sum(older_accuracy) / len(older_accuracy)
+                # Window aggregates are identical on every row
+                summary = daily_accuracy[0]
+                recent_avg = summary["recent_avg"] or 0
+                older_avg = summary["older_avg"] or 0
 
+                # Calculate trend direction
+                if summary["recent_days"] >= 3 and summary["older_days"] >= 3:
                     if recent_avg > older_avg + 0.05:
                         trend = "improving"
                     elif recent_avg < older_avg - 0.05:
@@ -191,16 +202,9 @@ class PredictionService:
 
                 return {
                     "trend": trend,
-                    "recent_average_accuracy": sum(recent_accuracy)
-                    / len(recent_accuracy)
-                    if recent_accuracy
-                    else 0,
-                    "older_average_accuracy": sum(older_accuracy) / len(older_accuracy)
-                    if older_accuracy
-                    else 0,
-                    "total_predictions": sum(
-                        row["predictions_count"] for row in daily_accuracy
-                    ),
+                    "recent_average_accuracy": recent_avg,
+                    "older_average_accuracy": older_avg,
+                    "total_predictions": summary["total_predictions"],
                     "analysis_period_days": len(daily_accuracy),
                     "daily_data": [
                         {
@@ -212,7 +216,8 @@ class PredictionService:
                     ],
                 }
 
-        except Exception:
+        except Exception as e:
+            log.exception("Failed to calculate accuracy trends for %s", user_email)
             return {"trend": "error", "message": f"Error calculating trends: {str(e)}"}
 
     def get_prediction_type_performance(
@@ -240,7 +245,11 @@ class PredictionService:
                         AVG(accuracy_score) as avg_accuracy,
                         MIN(accuracy_score) as min_accuracy,
                         MAX(accuracy_score) as max_accuracy,
-                        AVG(ABS(predicted_value - actual_value)) as avg_error
+                        AVG(ABS(predicted_value - actual_value)) as avg_error,
+                        -- same formula as _calculate_reliability_score
+                        ROUND(
+                            AVG(accuracy_score) * MIN(1.0, COUNT(*) / 20.0), 3
+                        ) as reliability_score
                     FROM prediction_accuracy 
                     WHERE user_email = ?
                     GROUP BY prediction_type
@@ -257,14 +266,15 @@ class PredictionService:
                         "min_accuracy": row["min_accuracy"],
                         "max_accuracy": row["max_accuracy"],
                         "average_error": row["avg_error"],
-                        "reliability_score": self._calculate_reliability_score(
-                            row["total_predictions"], row["avg_accuracy"]
-                        ),
+                        "reliability_score": row["reliability_score"],
                     }
 
                 return results
 
         except Exception:
+            log.exception(
+                "Failed to load prediction type performance for %s", user_email
+            )
             return {}
 
     def _calculate_reliability_score(
@@ -1,172 +1,289 @@
+import logging
 import sqlite3
-from passlib.hash import bcrypt
-from datetime import datetime
+import threading
+import time
+from collections import OrderedDict
 
-DB_NAME = "data/ascend.db"
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
 
+from app.auth import verify_password_async
+from app.db import today_iso
+from app.db_pool import get_read_conn, get_write_conn
+from app.models import Food
+
+log = logging.getLogger("ascend.queries")
 
-def create_user(email, password):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    hashed_pw = bcrypt.hash(password)
-    try:
-        cursor.execute(
-            "INSERT INTO users (email, password) VALUES (?, ?)", (email, hashed_pw)
-        )
-        conn.commit()
-        return True
-    except sqlite3.IntegrityError:
-        return False
-    except Exception:
-        return False
-    finally:
-        conn.close()
 
+def _write(sql, params=()):
+    """
+    Run one write statement on the writer connection and commit it.
+    Returns the rowid of the inserted row (meaningful for INSERTs only).
+    """
+    with get_write_conn() as conn:
+        return conn.execute(sql, params).lastrowid
 
-def login_user(email, password):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute("SELECT password FROM users WHERE email = ?", (email,))
-    row = cursor.fetchone()
-    conn.close()
 
-    if row:
-        return bcrypt.verify(password, row[0])
-    return False
+def _writemany(sql, seq_of_params):
+    """Run a write statement for every parameter set in a single transaction."""
+    with get_write_conn() as conn:
+        conn.executemany(sql, seq_of_params)
 
 
-def insert_food(food, user_email):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
+# Per-user tables whose list endpoints are served with an ETag
+_VERSIONED_TABLES = frozenset({"foods", "workouts"})
 
-    date = datetime.today().strftime("%Y-%m-%d")  # <-- Add this line
 
-    cursor.execute(
-        """
-        INSERT INTO foods (name, calories, protein, carbs, fat, fiber, sugar, user_email, date)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            food.name,
-            food.calories,
-            food.protein,
-            food.carbs,
-            food.fat,
-            food.fiber,
-            food.sugar,
-            user_email,
-            date,
-        ),
+def get_list_version(table, user_email):
+    """
+    Cheap change token for a user's rows in table: (row count, max rowid).
+    Any insert or delete changes it.
+    """
+    if table not in _VERSIONED_TABLES:
+        raise ValueError(f"unversioned table: {table}")
+    with get_read_conn() as conn:
+        row = conn.execute(
+            f"SELECT COUNT(*), MAX(rowid) FROM {table} WHERE user_email = ?",
+            (user_email,),
+        ).fetchone()
+    return row[0], row[1] or 0
+
+
+def create_user(email, hashed_pw):
+    """Insert a user; the password must already be hashed (see app.auth)."""
+    with get_write_conn() as conn:
+        try:
+            conn.execute(
+                "INSERT INTO users (email, password) VALUES (?, ?)", (email, hashed_pw)
+            )
+            _forget_user(email)
+            return True
+        except sqlite3.IntegrityError:
+            return False
+        except Exception:
+            log.debug("create_user failed for %s", email, exc_info=True)
+            return False
+
+
+async def login_user(email, password):
+    """
+    True if password matches the stored hash. The user lookup runs on the
+    request threadpool and the bcrypt check on the bcrypt pool, so the event
+    loop is never blocked.
+    """
+    user = await run_in_threadpool(get_user_by_email, email)
+    if user is None:
+        return False
+    return await verify_password_async(password, user["password"])
+
+
+_INSERT_FOOD_SQL = """
+    INSERT INTO foods (name, calories, protein, carbs, fat, fiber, sugar, user_email, date)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _food_params(food, user_email, date):
+    return (
+        food.name,
+        food.calories,
+        food.protein,
+        food.carbs,
+        food.fat,
+        food.fiber,
+        food.sugar,
+        user_email,
+        date,
     )
-    conn.commit()
-    conn.close()
+
+
+def insert_foods(foods, user_email, date=None):
+    """
+    Insert several foods in one transaction (one commit).
+    date is an ISO date string and defaults to today.
+    """
+    date = date or today_iso()
+    _writemany(_INSERT_FOOD_SQL, [_food_params(f, user_email, date) for f in foods])
+    _forget_macros(user_email, date)
+
+
+def bulk_insert_foods(user_email, rows, default_date=None):
+    """
+    Insert food rows given as mappings (name, calories, ..., optional date)
+    in one executemany call and one transaction. rows may be any iterable,
+    e.g. a csv.DictReader; it is consumed lazily. Each row is validated
+    through app.models.Food, so rows with a missing name or blank or
+    non-numeric macros are skipped rather than stored as NULL or TEXT.
+    Returns (inserted, skipped).
+    """
+    default_date = default_date or today_iso()
+    skipped = 0
+
+    def valid_params():
+        nonlocal skipped
+        for row in rows:
+            try:
+                food = Food.model_validate(row)
+            except ValidationError:
+                skipped += 1
+                continue
+            yield _food_params(food, user_email, row.get("date") or default_date)
+
+    with get_write_conn() as conn:
+        inserted = conn.executemany(_INSERT_FOOD_SQL, valid_params()).rowcount
+    _forget_macros(user_email)
+    return inserted, skipped
+
+
+def insert_food(food, user_email, date=None):
+    """Insert one food; returns its id."""
+    date = date or today_iso()
+    food_id = _write(_INSERT_FOOD_SQL, _food_params(food, user_email, date))
+    _forget_macros(user_email, date)
+    return food_id
+
+
+_FOOD_COLUMNS = "id, name, calories, protein, carbs, fat, fiber, sugar, user_email"
+_SQL_FOODS_BY_USER = f"SELECT {_FOOD_COLUMNS} FROM foods WHERE user_email = ?"
+_SQL_FOODS_BY_USER_AND_DATE = _SQL_FOODS_BY_USER + " AND date = ?"
 
 
 def get_foods_by_user_and_date(user_email, date=None):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    if date:
-        cursor.execute(
-            "SELECT * FROM foods WHERE user_email = ? AND date = ?", (user_email, date)
-        )
-    else:
-        cursor.execute("SELECT * FROM foods WHERE user_email = ?", (user_email,))
-    rows = cursor.fetchall()
-    conn.close()
-    return rows
+    with get_read_conn() as conn:
+        if date:
+            cursor = conn.execute(_SQL_FOODS_BY_USER_AND_DATE, (user_email, date))
+        else:
+            cursor = conn.execute(_SQL_FOODS_BY_USER, (user_email,))
+        return cursor.fetchall()
 
 
 def get_foods_by_user(user_email):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM foods WHERE user_email = ?", (user_email,))
-    rows = cursor.fetchall()
-    conn.close()
-
-    foods = []
-    for row in rows:
-        foods.append(
-            {
-                "id": row[0],
-                "name": row[1],
-                "calories": row[2],
-                "protein": row[3],
-                "carbs": row[4],
-                "fat": row[5],
-                "fiber": row[6],
-                "sugar": row[7],
-                "user_email": row[8],
-            }
-        )
+    with get_read_conn() as conn:
+        return [dict(row) for row in conn.execute(_SQL_FOODS_BY_USER, (user_email,))]
+
+
+def _iter_rows(sql, params, batch_size):
+    """
+    Yield query results as lists of up to batch_size dicts.
+    The pooled connection is held until the generator is exhausted or closed.
+    """
+    with get_read_conn() as conn:
+        cursor = conn.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield [dict(row) for row in rows]
+
+
+def iter_foods_by_user(user_email, batch_size=256):
+    return _iter_rows(_SQL_FOODS_BY_USER, (user_email,), batch_size)
+
+
+# Per-process TTL LRU of user rows for /login. Only hits are cached, so a user
+# created after a failed lookup is found on the next call; create_user also
+# drops the entry. The TTL bounds how long another worker can keep serving a
+# changed or deleted user row.
+USER_CACHE_SIZE = 2048
+USER_CACHE_TTL = 30.0
+_user_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_user_cache_lock = threading.Lock()
+
 
-    return foods
+def _forget_user(email):
+    with _user_cache_lock:
+        _user_cache.pop(email, None)
 
 
 def get_user_by_email(email):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM users WHERE email = ?", (email,))
-    row = cursor.fetchone()
-    conn.close()
+    with _user_cache_lock:
+        hit = _user_cache.get(email)
+        if hit is not None and hit[0] > time.monotonic():
+            _user_cache.move_to_end(email)
+            return dict(hit[1])
+
+    now = time.monotonic()
+    with get_read_conn() as conn:
+        cursor = conn.execute(
+            "SELECT id, email, password FROM users WHERE email = ?", (email,)
+        )
+        row = cursor.fetchone()
 
     if row:
-        return {"id": row[0], "email": row[1], "password": row[2]}
+        user = {"id": row[0], "email": row[1], "password": row[2]}
+        with _user_cache_lock:
+            _user_cache[email] = (now + USER_CACHE_TTL, user)
+            _user_cache.move_to_end(email)
+            if len(_user_cache) > USER_CACHE_SIZE:
+                _user_cache.popitem(last=False)
+        return dict(user)
     return None
 
 
 def insert_weight(user_email, date, weight):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute(
+    _write(
         "INSERT INTO weights (user_email, date, weight) VALUES (?, ?, ?)",
         (user_email, date, weight),
     )
-    conn.commit()
-    conn.close()
 
 
-def get_summary(user_email, date):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-        SELECT 
-            SUM(calories), SUM(protein), SUM(carbs), 
-            SUM(fat), SUM(fiber), SUM(sugar)
-        FROM foods
-        WHERE user_email = ? AND date = ?
-    """,
-        (user_email, date),
-    )
-    food_totals = cursor.fetchone()
+# Daily totals come from the daily_macros rollup (kept current by triggers on
+# foods, see migrations/006_add_daily_macros_rollup.py). MAX() over the one
+# matching row still yields a row of zeros for a day with no foods.
+_SUMMARY_SQL = """
+    SELECT
+        COALESCE(MAX(calories),0), COALESCE(MAX(protein),0),
+        COALESCE(MAX(carbs),0), COALESCE(MAX(fat),0),
+        COALESCE(MAX(fiber),0), COALESCE(MAX(sugar),0),
+        (SELECT weight FROM weights WHERE user_email = ? AND date = ?)
+    FROM daily_macros
+    WHERE user_email = ? AND date = ?
+"""
+_SUMMARY_FROM_FOODS_SQL = """
+    SELECT
+        COALESCE(SUM(calories),0), COALESCE(SUM(protein),0),
+        COALESCE(SUM(carbs),0), COALESCE(SUM(fat),0),
+        COALESCE(SUM(fiber),0), COALESCE(SUM(sugar),0),
+        (SELECT weight FROM weights WHERE user_email = ? AND date = ?)
+    FROM foods
+    WHERE user_email = ? AND date = ?
+"""
+
+
+def _daily_totals(conn, rollup_sql, foods_sql, params):
+    """Read from the rollup; databases without it (006 not applied) sum foods."""
+    try:
+        return conn.execute(rollup_sql, params).fetchone()
+    except sqlite3.OperationalError as e:
+        if "no such table" not in str(e):
+            raise
+        return conn.execute(foods_sql, params).fetchone()
 
-    cursor.execute(
-        "SELECT weight FROM weights WHERE user_email = ? AND date = ?",
-        (user_email, date),
-    )
-    weight_row = cursor.fetchone()
-    conn.close()
+
+def get_summary(user_email, date):
+    with get_read_conn() as conn:
+        row = _daily_totals(
+            conn,
+            _SUMMARY_SQL,
+            _SUMMARY_FROM_FOODS_SQL,
+            (user_email, date, user_email, date),
+        )
 
     return {
-        "calories": food_totals[0] or 0,
-        "protein": food_totals[1] or 0,
-        "carbs": food_totals[2] or 0,
-        "fat": food_totals[3] or 0,
-        "fiber": food_totals[4] or 0,
-        "sugar": food_totals[5] or 0,
-        "weight": weight_row[0] if weight_row else None,
+        "calories": row[0],
+        "protein": row[1],
+        "carbs": row[2],
+        "fat": row[3],
+        "fiber": row[4],
+        "sugar": row[5],
+        "weight": row[6],
     }
 
 
 # queries.py
 def delete_food(food_id, user_email):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute(
-        "DELETE FROM foods WHERE id = ? AND user_email = ?", (food_id, user_email)
-    )
-    conn.commit()
-    conn.close()
+    _write("DELETE FROM foods WHERE id = ? AND user_email = ?", (food_id, user_email))
+    _forget_macros(user_email)
 
 
 class Exercise:
@@ -176,73 +293,120 @@ class Exercise:
         self.unit = unit
 
 
-class ExerciseLog:
-    def __init__(self, workout_id, exercise_id, set_number, reps, weight):
-        self.workout_id = workout_id
-        self.exercise_id = exercise_id
-        self.set_number = set_number
-        self.reps = reps
-        self.weight = weight
+_INSERT_EXERCISE_LOG_SQL = """
+    INSERT INTO exercise_logs (workout_id, exercise_id, set_number, reps, weight)
+    VALUES (?, ?, ?, ?, ?)
+"""
 
 
-def insert_exercise_log(user_email: str, log: ExerciseLog):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-        INSERT INTO exercise_logs (workout_id, exercise_id, set_number, reps, weight)
-        VALUES (?, ?, ?, ?, ?)
-        """,
-        (log.workout_id, log.exercise_id, log.set_number, log.reps, log.weight),
-    )
-    conn.commit()
-    conn.close()
+def _exercise_log_params(log):
+    return (log.workout_id, log.exercise_id, log.set_number, log.reps, log.weight)
 
 
-def get_exercises_by_user(user_email):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute(
-        "SELECT id, name, category, unit FROM exercises WHERE user_email = ?",
-        (user_email,),
-    )
-    rows = cursor.fetchall()
-    conn.close()
+def insert_exercise_logs(user_email: str, logs):
+    """
+    Insert several exercise sets in one transaction (one commit).
+    logs are validated app.models.ExerciseLog request bodies.
+    """
+    _writemany(_INSERT_EXERCISE_LOG_SQL, [_exercise_log_params(log) for log in logs])
 
-    return [
-        {"id": row[0], "name": row[1], "category": row[2], "unit": row[3]}
-        for row in rows
-    ]
+
+def insert_exercise_log(user_email: str, log):
+    """Insert one exercise set; returns its id."""
+    return _write(_INSERT_EXERCISE_LOG_SQL, _exercise_log_params(log))
+
+
+_SQL_EXERCISES_BY_USER = (
+    "SELECT id, name, category, unit FROM exercises WHERE user_email = ?"
+)
+
+
+def get_exercises_by_user(user_email):
+    with get_read_conn() as conn:
+        cursor = conn.execute(_SQL_EXERCISES_BY_USER, (user_email,))
+        return [dict(row) for row in cursor]
 
 
 def insert_workout(user_email: str, workout):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute(
+    """Insert one workout; returns its id."""
+    return _write(
         """
         INSERT INTO workouts (user_email, date, name)
         VALUES (?, ?, ?)
         """,
         (user_email, workout.date, workout.name),
     )
-    conn.commit()
+
+
+_SQL_WORKOUTS_BY_USER = """
+    SELECT id, date, name
+    FROM workouts
+    WHERE user_email = ?
+    ORDER BY date DESC
+"""
 
 
 def get_workouts_by_user(user_email: str):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-        SELECT id, date, name
-        FROM workouts
-        WHERE user_email = ?
-        ORDER BY date DESC
-        """,
-        (user_email,),
-    )
-    rows = cursor.fetchall()
-    conn.close()
-    return [{"id": row[0], "date": row[1], "name": row[2]} for row in rows]
+    with get_read_conn() as conn:
+        cursor = conn.execute(_SQL_WORKOUTS_BY_USER, (user_email,))
+        return [dict(row) for row in cursor]
+
+
+def iter_workouts_by_user(user_email: str, batch_size=256):
+    return _iter_rows(_SQL_WORKOUTS_BY_USER, (user_email,), batch_size)
+
+
+_MACROS_SQL = """
+    SELECT
+        COALESCE(MAX(calories),0),
+        COALESCE(MAX(protein),0),
+        COALESCE(MAX(carbs),0),
+        COALESCE(MAX(fat),0)
+    FROM daily_macros
+    WHERE user_email = ?
+      AND date = ?
+"""
+_MACROS_FROM_FOODS_SQL = """
+    SELECT
+        COALESCE(SUM(calories),0),
+        COALESCE(SUM(protein),0),
+        COALESCE(SUM(carbs),0),
+        COALESCE(SUM(fat),0)
+    FROM foods
+    WHERE user_email = ?
+      AND date = ?
+"""
+
+# Per-process TTL LRU of daily macro totals, keyed by (user_email, iso_date).
+# Writes in this process drop the affected entries; the TTL bounds how stale
+# another worker's copy can be.
+MACROS_CACHE_SIZE = 10_000
+MACROS_CACHE_TTL = 15.0
+_macros_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_macros_cache_lock = threading.Lock()
+
+
+def _forget_macros(user_email, iso_date=None):
+    with _macros_cache_lock:
+        if iso_date is not None:
+            _macros_cache.pop((user_email, iso_date), None)
+            return
+        for key in [k for k in _macros_cache if k[0] == user_email]:
+            del _macros_cache[key]
+
+
+def peek_macros(user_email: str, iso_date: str):
+    """
+    Cached get_macros_for_user_today result, or None on a miss.
+    Never touches the database, so it is safe to call from the event loop.
+    """
+    key = (user_email, iso_date)
+    with _macros_cache_lock:
+        hit = _macros_cache.get(key)
+        if hit is not None and hit[0] > time.monotonic():
+            _macros_cache.move_to_end(key)
+            return dict(hit[1])
+    return None
 
 
 def get_macros_for_user_today(user_email: str, iso_date: str):
@@ -250,28 +414,26 @@ def get_macros_for_user_today(user_email: str, iso_date: str):
     Return dict with calories, protein, carbs, fat for given user & date
     (other fields can be added as needed).
     """
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-
-    cursor.execute(
-        """
-        SELECT 
-            COALESCE(SUM(calories),0),
-            COALESCE(SUM(protein),0),
-            COALESCE(SUM(carbs),0),
-            COALESCE(SUM(fat),0)
-        FROM foods
-        WHERE user_email = ?
-          AND date = ?
-        """,
-        (user_email, iso_date),
-    )
-    row = cursor.fetchone()
-    conn.close()
+    cached = peek_macros(user_email, iso_date)
+    if cached is not None:
+        return cached
+
+    key = (user_email, iso_date)
+    now = time.monotonic()
+    with get_read_conn() as conn:
+        row = _daily_totals(
+            conn, _MACROS_SQL, _MACROS_FROM_FOODS_SQL, (user_email, iso_date)
+        )
 
-    return {
+    macros = {
         "calories": row[0],
         "protein": row[1],
         "carbs": row[2],
         "fats": row[3],  # note plural to match frontend label
     }
+    with _macros_cache_lock:
+        _macros_cache[key] = (now + MACROS_CACHE_TTL, macros)
+        _macros_cache.move_to_end(key)
+        if len(_macros_cache) > MACROS_CACHE_SIZE:
+            _macros_cache.popitem(last=False)
+    return dict(macros)
@@ -9,13 +9,18 @@ import os
 from datetime import datetime
 
 
-def run_migration(db_path="data/ascend.db"):
-    """Run the analytics tables migration"""
+def run_migration(db_path="data/ascend.db", conn=None):
+    """
+    Run the analytics tables migration.
+    With conn (autocommit, transaction already open), the caller commits.
+    """
 
-    # Ensure the data folder exists
-    os.makedirs(os.path.dirname(db_path), exist_ok=True)
-
-    conn = sqlite3.connect(db_path)
+    own_conn = conn is None
+    if own_conn:
+        # Ensure the data folder exists
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        conn.execute("BEGIN IMMEDIATE")
     cursor = conn.cursor()
 
     try:
@@ -26,7 +31,7 @@ def run_migration(db_path="data/ascend.db"):
             user_email TEXT NOT NULL,
             analysis_type TEXT NOT NULL,
             time_period INTEGER NOT NULL,
-            result_data TEXT NOT NULL,  -- JSON blob
+            result_data BLOB NOT NULL,  -- zlib-compressed JSON
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             expires_at TIMESTAMP NOT NULL,
             confidence_level REAL,
@@ -70,17 +75,20 @@ def run_migration(db_path="data/ascend.db"):
         ON prediction_accuracy(prediction_date, actual_date)
         """)
 
-        conn.commit()
+        if own_conn:
+            conn.execute("COMMIT")
         print(
             f"✅ Analytics tables migration completed successfully at {datetime.now()}"
         )
 
     except Exception as e:
-        conn.rollback()
+        if own_conn and conn.in_transaction:
+            conn.execute("ROLLBACK")
         print(f"❌ Migration failed: {e}")
         raise
     finally:
-        conn.close()
+        if own_conn:
+            conn.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,61 @@
+"""
+Migration: Add per-user date indexes on prediction_accuracy
+Date: 2026-10-16
+Description: Lets the recent-records and daily-trend accuracy queries use
+index range scans instead of scanning the table
+"""
+
+import sqlite3
+import os
+from datetime import datetime
+
+
+def run_migration(db_path="data/ascend.db", conn=None):
+    """
+    Run the prediction accuracy index migration.
+    With conn (autocommit, transaction already open), the caller commits.
+    """
+
+    own_conn = conn is None
+    if own_conn:
+        # Ensure the data folder exists
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        conn.execute("BEGIN IMMEDIATE")
+    cursor = conn.cursor()
+
+    try:
+        # Recent records: WHERE user_email = ? AND actual_date >= ? ORDER BY actual_date
+        cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_pa_user_actual 
+        ON prediction_accuracy(user_email, actual_date)
+        """)
+
+        # Daily trends: GROUP BY DATE(actual_date) with AVG(accuracy_score),
+        # answered from the index alone
+        cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_pa_user_day 
+        ON prediction_accuracy(user_email, DATE(actual_date), accuracy_score)
+        """)
+
+        # Refresh planner statistics so the new indexes are picked up
+        cursor.execute("ANALYZE prediction_accuracy")
+
+        if own_conn:
+            conn.execute("COMMIT")
+        print(
+            f"✅ Prediction accuracy index migration completed successfully at {datetime.now()}"
+        )
+
+    except Exception as e:
+        if own_conn and conn.in_transaction:
+            conn.execute("ROLLBACK")
+        print(f"❌ Migration failed: {e}")
+        raise
+    finally:
+        if own_conn:
+            conn.close()
+
+
+if __name__ == "__main__":
+    run_migration()
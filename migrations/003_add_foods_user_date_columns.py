@@ -0,0 +1,91 @@
+"""
+Migration: Add user_email and date columns to foods
+Date: 2026-10-16
+Description: Databases created by the old scripts/init_db.py have a foods table
+without the user_email/date columns the app reads and writes. Adds them,
+backfills what can be recovered from meals/meal_items, and creates the
+per-user, per-day covering index
+"""
+
+import sqlite3
+import os
+from datetime import datetime
+
+
+def run_migration(db_path="data/ascend.db", conn=None):
+    """
+    Run the foods user/date column migration.
+    With conn (autocommit, transaction already open), the caller commits.
+    """
+
+    own_conn = conn is None
+    if own_conn:
+        # Ensure the data folder exists
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        conn.execute("BEGIN IMMEDIATE")
+    cursor = conn.cursor()
+
+    try:
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(foods)")}
+        if not columns:
+            print("ℹ️  Table foods not found, nothing to migrate")
+            return
+
+        # ALTER TABLE cannot add a NOT NULL column without a default
+        if "user_email" not in columns:
+            cursor.execute("ALTER TABLE foods ADD COLUMN user_email TEXT")
+        if "date" not in columns:
+            cursor.execute("ALTER TABLE foods ADD COLUMN date TEXT")
+
+        # Backfill from the meal a food was logged in, where there is one
+        tables = {
+            row[0]
+            for row in cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            )
+        }
+        if {"meals", "meal_items"} <= tables:
+            cursor.execute("""
+            UPDATE foods SET
+                user_email = COALESCE(user_email, (
+                    SELECT u.email
+                    FROM meal_items mi
+                    JOIN meals m ON m.id = mi.meal_id
+                    JOIN users u ON u.id = m.user_id
+                    WHERE mi.food_id = foods.id
+                    LIMIT 1
+                )),
+                date = COALESCE(date, (
+                    SELECT substr(m.timestamp, 1, 10)
+                    FROM meal_items mi
+                    JOIN meals m ON m.id = mi.meal_id
+                    WHERE mi.food_id = foods.id
+                    LIMIT 1
+                ))
+            WHERE user_email IS NULL OR date IS NULL
+            """)
+
+        cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_foods_user_date_macros
+        ON foods(user_email, date, calories, protein, carbs, fat, fiber, sugar)
+        """)
+
+        if own_conn:
+            conn.execute("COMMIT")
+        print(
+            f"✅ Foods user/date column migration completed successfully at {datetime.now()}"
+        )
+
+    except Exception as e:
+        if own_conn and conn.in_transaction:
+            conn.execute("ROLLBACK")
+        print(f"❌ Migration failed: {e}")
+        raise
+    finally:
+        if own_conn:
+            conn.close()
+
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,75 @@
+"""
+Migration: Add (user_email, date) indexes on foods, weights and workouts
+Date: 2026-10-16
+Description: The daily summary/macros aggregations are answered from a covering
+index on foods; weight and workout lookups get plain composite indexes
+"""
+
+import sqlite3
+import os
+from datetime import datetime
+
+# (table, index name, columns)
+INDEXES = [
+    (
+        "foods",
+        "idx_foods_user_date_macros",
+        "user_email, date, calories, protein, carbs, fat, fiber, sugar",
+    ),
+    ("weights", "idx_weights_user_date", "user_email, date"),
+    ("workouts", "idx_workouts_user_date", "user_email, date"),
+]
+
+
+def run_migration(db_path="data/ascend.db", conn=None):
+    """
+    Run the user/date index migration.
+    With conn (autocommit, transaction already open), the caller commits.
+    """
+
+    own_conn = conn is None
+    if own_conn:
+        # Ensure the data folder exists
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        conn.execute("BEGIN IMMEDIATE")
+    cursor = conn.cursor()
+
+    try:
+        existing = {
+            row[0]
+            for row in cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            )
+        }
+
+        for table, name, columns in INDEXES:
+            if table not in existing:
+                print(f"ℹ️  Table {table} not found, skipping {name}")
+                continue
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table}({columns})")
+
+        # The covering index has the same prefix, so the plain one is redundant
+        cursor.execute("DROP INDEX IF EXISTS idx_foods_user_date")
+
+        # Refresh planner statistics so the new indexes are picked up
+        cursor.execute("ANALYZE")
+
+        if own_conn:
+            conn.execute("COMMIT")
+        print(
+            f"✅ User/date index migration completed successfully at {datetime.now()}"
+        )
+
+    except Exception as e:
+        if own_conn and conn.in_transaction:
+            conn.execute("ROLLBACK")
+        print(f"❌ Migration failed: {e}")
+        raise
+    finally:
+        if own_conn:
+            conn.close()
+
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,46 @@
+"""
+Migration: Enable incremental auto-vacuum
+Date: 2026-10-16
+Description: Lets the periodic analytics_cache purge return freed pages with
+PRAGMA incremental_vacuum instead of leaving the file at its high-water mark
+"""
+
+import sqlite3
+import os
+from datetime import datetime
+
+# VACUUM cannot run inside the runner's shared transaction
+TRANSACTIONAL = False
+
+
+def run_migration(db_path="data/ascend.db"):
+    """Run the incremental auto-vacuum migration"""
+
+    # Ensure the data folder exists
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+    # autocommit: VACUUM cannot run inside a transaction
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    cursor = conn.cursor()
+
+    try:
+        # 0 = NONE, 1 = FULL, 2 = INCREMENTAL
+        mode = cursor.execute("PRAGMA auto_vacuum").fetchone()[0]
+        if mode != 2:
+            cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            # Changing the mode on an existing database takes effect after VACUUM
+            cursor.execute("VACUUM")
+
+        print(
+            f"✅ Incremental vacuum migration completed successfully at {datetime.now()}"
+        )
+
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        raise
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,126 @@
+"""
+Migration: Add daily_macros rollup table
+Date: 2026-10-16
+Description: Keeps per-user, per-day macro totals up to date with triggers on
+foods, so the daily summary reads one row instead of summing the day's foods
+"""
+
+import sqlite3
+import os
+from datetime import datetime
+
+# Adds NEW's macros to its (user_email, date) row, creating it if needed.
+# INSERT ... SELECT needs the WHERE before ON CONFLICT to parse unambiguously.
+UPSERT_NEW = """
+    INSERT INTO daily_macros
+        (user_email, date, calories, protein, carbs, fat, fiber, sugar)
+    SELECT NEW.user_email, NEW.date,
+           COALESCE(NEW.calories, 0), COALESCE(NEW.protein, 0),
+           COALESCE(NEW.carbs, 0), COALESCE(NEW.fat, 0),
+           COALESCE(NEW.fiber, 0), COALESCE(NEW.sugar, 0)
+    WHERE NEW.user_email IS NOT NULL AND NEW.date IS NOT NULL
+    ON CONFLICT (user_email, date) DO UPDATE SET
+        calories = calories + excluded.calories,
+        protein = protein + excluded.protein,
+        carbs = carbs + excluded.carbs,
+        fat = fat + excluded.fat,
+        fiber = fiber + excluded.fiber,
+        sugar = sugar + excluded.sugar;
+"""
+
+# Takes OLD's macros back out of its row
+SUBTRACT_OLD = """
+    UPDATE daily_macros SET
+        calories = calories - COALESCE(OLD.calories, 0),
+        protein = protein - COALESCE(OLD.protein, 0),
+        carbs = carbs - COALESCE(OLD.carbs, 0),
+        fat = fat - COALESCE(OLD.fat, 0),
+        fiber = fiber - COALESCE(OLD.fiber, 0),
+        sugar = sugar - COALESCE(OLD.sugar, 0)
+    WHERE user_email = OLD.user_email AND date = OLD.date;
+"""
+
+
+def run_migration(db_path="data/ascend.db", conn=None):
+    """
+    Run the daily macros rollup migration.
+    With conn (autocommit, transaction already open), the caller commits.
+    """
+
+    own_conn = conn is None
+    if own_conn:
+        # Ensure the data folder exists
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        conn.execute("BEGIN IMMEDIATE")
+    cursor = conn.cursor()
+
+    try:
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(foods)")}
+        if not {"user_email", "date"} <= columns:
+            print("ℹ️  Table foods not found (or not migrated), skipping rollup")
+            return
+
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS daily_macros (
+            user_email TEXT NOT NULL,
+            date TEXT NOT NULL,
+            calories REAL NOT NULL DEFAULT 0,
+            protein REAL NOT NULL DEFAULT 0,
+            carbs REAL NOT NULL DEFAULT 0,
+            fat REAL NOT NULL DEFAULT 0,
+            fiber REAL NOT NULL DEFAULT 0,
+            sugar REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_email, date)
+        ) WITHOUT ROWID
+        """)
+
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS foods_daily_macros_insert
+        AFTER INSERT ON foods
+        BEGIN {UPSERT_NEW} END
+        """)
+
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS foods_daily_macros_delete
+        AFTER DELETE ON foods
+        BEGIN {SUBTRACT_OLD} END
+        """)
+
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS foods_daily_macros_update
+        AFTER UPDATE ON foods
+        BEGIN {SUBTRACT_OLD} {UPSERT_NEW} END
+        """)
+
+        # Backfill from the rows already in foods
+        cursor.execute("""
+        INSERT OR REPLACE INTO daily_macros
+            (user_email, date, calories, protein, carbs, fat, fiber, sugar)
+        SELECT user_email, date,
+               COALESCE(SUM(calories), 0), COALESCE(SUM(protein), 0),
+               COALESCE(SUM(carbs), 0), COALESCE(SUM(fat), 0),
+               COALESCE(SUM(fiber), 0), COALESCE(SUM(sugar), 0)
+        FROM foods
+        WHERE user_email IS NOT NULL AND date IS NOT NULL
+        GROUP BY user_email, date
+        """)
+
+        if own_conn:
+            conn.execute("COMMIT")
+        print(
+            f"✅ Daily macros rollup migration completed successfully at {datetime.now()}"
+        )
+
+    except Exception as e:
+        if own_conn and conn.in_transaction:
+            conn.execute("ROLLBACK")
+        print(f"❌ Migration failed: {e}")
+        raise
+    finally:
+        if own_conn:
+            conn.close()
+
+
+if __name__ == "__main__":
+    run_migration()
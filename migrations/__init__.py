@@ -0,0 +1 @@
+"""Database migrations, applied in name order by run_migrations.py"""
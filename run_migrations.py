@@ -3,45 +3,83 @@ Migration runner for Ascend database
 Runs all pending migrations in order
 """
 
+import os
 import sys
-import importlib.util
-from pathlib import Path
+import sqlite3
+import importlib
+import pkgutil
 
 
 def run_all_migrations(db_path="data/ascend.db"):
     """Run all migration files in the migrations directory"""
 
-    migrations_dir = Path("migrations")
-
-    if not migrations_dir.exists():
+    try:
+        import migrations as migrations_pkg
+    except ImportError:
         print("❌ Migrations directory not found")
         return False
 
-    # Get all migration files and sort them
-    migration_files = sorted(
-        [f for f in migrations_dir.glob("*.py") if f.name != "__init__.py"]
+    # Get all migration modules and sort them
+    migration_names = sorted(
+        name
+        for _, name, is_pkg in pkgutil.iter_modules(migrations_pkg.__path__)
+        if not is_pkg
     )
 
-    if not migration_files:
+    if not migration_names:
         print("ℹ️  No migration files found")
         return True
 
-    print(f"🔄 Running {len(migration_files)} migration(s)...")
+    print(f"🔄 Running {len(migration_names)} migration(s)...")
 
-    for migration_file in migration_files:
+    # Load every migration first so a broken file fails before any DDL runs.
+    # Regular imports, so warm boots reuse migrations/__pycache__.
+    migrations = []
+    for name in migration_names:
         try:
-            print(f"📄 Running migration: {migration_file.name}")
+            migration_module = importlib.import_module(f"migrations.{name}")
+        except Exception as e:
+            print(f"❌ Failed to load migration {name}.py: {e}")
+            return False
+        migrations.append((f"{name}.py", migration_module))
 
-            # Import and run the migration
-            spec = importlib.util.spec_from_file_location("migration", migration_file)
-            migration_module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(migration_module)
+    # Transactional migrations share one connection and a single
+    # BEGIN IMMEDIATE ... COMMIT, so a cold init costs one commit (one fsync)
+    # and a failure leaves the database untouched.
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    # Only takes effect on a new, empty database (see scripts/init_db.py)
+    conn.execute("PRAGMA page_size = 4096")
+    current = None
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        for current, migration_module in migrations:
+            if not getattr(migration_module, "TRANSACTIONAL", True):
+                continue
+            print(f"📄 Running migration: {current}")
+            migration_module.run_migration(db_path, conn=conn)
+        current = None
+        conn.execute("COMMIT")
+    except Exception as e:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        if current:
+            print(f"❌ Failed to run migration {current}: {e}")
+        else:
+            print(f"❌ Failed to commit migrations: {e}")
+        return False
+    finally:
+        conn.close()
 
-            # Run the migration
+    # The rest (e.g. VACUUM) must run outside a transaction, on their own
+    for name, migration_module in migrations:
+        if getattr(migration_module, "TRANSACTIONAL", True):
+            continue
+        try:
+            print(f"📄 Running migration: {name}")
             migration_module.run_migration(db_path)
-
         except Exception as e:
-            print(f"❌ Failed to run migration {migration_file.name}: {e}")
+            print(f"❌ Failed to run migration {name}: {e}")
             return False
 
     print("✅ All migrations completed successfully")
@@ -22,7 +22,7 @@ def create_analytics_tables():
                 user_email TEXT NOT NULL,
                 analysis_type TEXT NOT NULL,
                 time_period INTEGER NOT NULL,
-                result_data TEXT NOT NULL,  -- JSON blob
+                result_data BLOB NOT NULL,  -- zlib-compressed JSON
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 expires_at TIMESTAMP NOT NULL,
                 confidence_level REAL DEFAULT 0.0,
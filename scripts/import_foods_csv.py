@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Import food log entries for one user from a CSV file.
+
+Usage (from the repository root):
+    python scripts/import_foods_csv.py foods.csv user@example.com
+
+Expected header: name,calories,protein,carbs,fat,fiber,sugar[,date]
+Rows without a date are logged for today. Rows with a missing name or a
+blank or non-numeric macro are skipped and counted. The whole file is
+inserted in a single transaction.
+"""
+
+import csv
+import sys
+from pathlib import Path
+
+# Make the app package importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import queries  # noqa: E402
+
+
+def import_foods_csv(csv_path, user_email):
+    """Stream csv_path into foods for user_email; returns (inserted, skipped)"""
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        return queries.bulk_insert_foods(user_email, csv.DictReader(f))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python scripts/import_foods_csv.py <file.csv> <user_email>")
+        sys.exit(1)
+
+    inserted, skipped = import_foods_csv(sys.argv[1], sys.argv[2])
+    print(f"✅ Imported {inserted} food entries for {sys.argv[2]}")
+    if skipped:
+        print(f"⚠️  Skipped {skipped} row(s) with a missing name or invalid macros")
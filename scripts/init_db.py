@@ -7,6 +7,10 @@ os.makedirs("data", exist_ok=True)
 conn = sqlite3.connect("data/ascend.db")
 cursor = conn.cursor()
 
+# Page size is fixed once the first table exists; pin it to match the OS page
+# so the pooled connections' mmap reads map whole pages
+cursor.execute("PRAGMA page_size = 4096")
+
 # USERS table
 cursor.execute("""
 CREATE TABLE IF NOT EXISTS users (
@@ -26,10 +30,18 @@ CREATE TABLE IF NOT EXISTS foods (
     carbs REAL,
     fat REAL,
     fiber REAL,
-    sugar REAL
+    sugar REAL,
+    user_email TEXT NOT NULL,
+    date TEXT NOT NULL
 )
 """)
 
+# Per-user, per-day lookups; covers the daily macro sums
+cursor.execute("""
+CREATE INDEX IF NOT EXISTS idx_foods_user_date_macros
+ON foods(user_email, date, calories, protein, carbs, fat, fiber, sugar)
+""")
+
 # MEALS table
 cursor.execute("""
 CREATE TABLE IF NOT EXISTS meals (
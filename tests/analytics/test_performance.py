@@ -10,7 +10,6 @@ from datetime import datetime, timedelta
 from typing import Dict, Any
 import statistics
 
-from app.analytics import AnalyticsService
 from app.db import AnalyticsDB, get_db_connection
 
 
@@ -18,6 +17,10 @@ class PerformanceTestSuite:
     """Test suite for analytics performance with large datasets"""
 
     def __init__(self):
+        # Imported here rather than at module level: pytest imports this file
+        # during collection, and app.analytics is the slow part of the app to load
+        from app.analytics import AnalyticsService
+
         self.analytics_service = AnalyticsService()
         self.analytics_db = AnalyticsDB()
         self.test_user_email = "performance_test@example.com"
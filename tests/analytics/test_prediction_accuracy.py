@@ -5,8 +5,8 @@ Tests the functionality implemented in task 8 of the predictive training perform
 
 import pytest
 import sqlite3
-import os
-import tempfile
+import uuid
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from unittest.mock import patch
 
@@ -14,49 +14,75 @@ from unittest.mock import patch
 from app.predictions import PredictionService
 from app.db import AnalyticsDB
 
+# Reference time for seeded dates, read once per module so every test's
+# relative dates line up (tests of "defaults to now" still use the clock)
+NOW = datetime.now().replace(microsecond=0)
+
+# Shared, read-only fixture rows: (prediction_type, predicted, actual)
+PREDICTION_DATE = "2024-01-01T10:00:00"
+ACTUAL_DATE = "2024-01-02T15:00:00"
+STATS_ROWS = (
+    ("workout_performance", 85.0, 90.0),
+    ("workout_performance", 75.0, 70.0),
+    ("weight_change", 2.0, 1.8),
+    ("weight_change", -1.0, -1.2),
+)
+TYPE_PERFORMANCE_ROWS = (
+    ("workout_performance", 85.0, 90.0),
+    ("workout_performance", 75.0, 80.0),
+    ("weight_change", 2.0, 2.1),
+    ("macro_target", 150.0, 145.0),
+)
+
 
 class TestPredictionAccuracyTracking:
     """Test suite for prediction accuracy tracking functionality"""
 
     @pytest.fixture
     def temp_db(self):
-        """Create a temporary database for testing"""
-        # Create temporary database file
-        db_fd, db_path = tempfile.mkstemp()
-        os.close(db_fd)
+        """Create a temporary in-memory database for testing"""
+        # A named shared-cache memory database lives as long as one
+        # connection to it is open; no file to create, fsync or unlink
+        db_path = f"file:pa_{uuid.uuid4().hex}?mode=memory&cache=shared"
+        keeper = sqlite3.connect(db_path, uri=True)
 
-        # Patch the DATABASE_PATH to use our temp database
+        # Patch the DATABASE_PATH to use our temp database for the whole test
         with patch("app.db.DATABASE_PATH", db_path):
             # Create the required tables
-            with sqlite3.connect(db_path) as conn:
-                conn.execute("""
-                    CREATE TABLE prediction_accuracy (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        user_email TEXT NOT NULL,
-                        prediction_type TEXT NOT NULL,
-                        predicted_value REAL NOT NULL,
-                        actual_value REAL NOT NULL,
-                        prediction_date TIMESTAMP NOT NULL,
-                        actual_date TIMESTAMP NOT NULL,
-                        accuracy_score REAL NOT NULL,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                conn.execute("""
-                    CREATE INDEX idx_prediction_accuracy_user_type
-                    ON prediction_accuracy(user_email, prediction_type)
-                """)
-                conn.commit()
+            keeper.execute("""
+                CREATE TABLE prediction_accuracy (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_email TEXT NOT NULL,
+                    prediction_type TEXT NOT NULL,
+                    predicted_value REAL NOT NULL,
+                    actual_value REAL NOT NULL,
+                    prediction_date TIMESTAMP NOT NULL,
+                    actual_date TIMESTAMP NOT NULL,
+                    accuracy_score REAL NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            keeper.execute("""
+                CREATE INDEX idx_prediction_accuracy_user_type
+                ON prediction_accuracy(user_email, prediction_type)
+            """)
+            keeper.commit()
 
             yield db_path
 
-        # Clean up - handle Windows file locking issues
+        # Closing the last connection discards the database
+        keeper.close()
+
+    @staticmethod
+    @contextmanager
+    def _open_db(db_path):
+        """Row-factory connection to the test database, closed on exit"""
+        conn = sqlite3.connect(db_path, uri=True)
+        conn.row_factory = sqlite3.Row
         try:
-            os.unlink(db_path)
-        except (PermissionError, FileNotFoundError):
-            # On Windows, files might be locked by SQLite connections
-            # This is acceptable for test cleanup
-            pass
+            yield conn
+        finally:
+            conn.close()
 
     @pytest.fixture
     def prediction_service(self):
@@ -65,235 +91,220 @@ class TestPredictionAccuracyTracking:
 
     def test_log_prediction_accuracy_success(self, temp_db, prediction_service):
         """Test successful logging of prediction accuracy"""
-        with patch("app.db.DATABASE_PATH", temp_db):
-            # Test data
-            user_email = "test@example.com"
-            prediction_type = "workout_performance"
-            predicted_value = 85.0
-            actual_value = 90.0
-            prediction_date = "2024-01-01T10:00:00"
-            actual_date = "2024-01-02T15:00:00"
-
-            # Log the accuracy
-            result = prediction_service.log_prediction_accuracy(
-                user_email,
-                prediction_type,
-                predicted_value,
-                actual_value,
-                prediction_date,
-                actual_date,
+        # Test data
+        user_email = "test@example.com"
+        prediction_type = "workout_performance"
+        predicted_value = 85.0
+        actual_value = 90.0
+        prediction_date = PREDICTION_DATE
+        actual_date = ACTUAL_DATE
+
+        # Log the accuracy
+        result = prediction_service.log_prediction_accuracy(
+            user_email,
+            prediction_type,
+            predicted_value,
+            actual_value,
+            prediction_date,
+            actual_date,
+        )
+
+        assert result is True
+
+        # Verify it was stored in database
+        with self._open_db(temp_db) as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT * FROM prediction_accuracy 
+                WHERE user_email = ? AND prediction_type = ?
+            """,
+                (user_email, prediction_type),
             )
 
-            assert result is True
-
-            # Verify it was stored in database
-            with sqlite3.connect(temp_db) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                cursor.execute(
-                    """
-                    SELECT * FROM prediction_accuracy 
-                    WHERE user_email = ? AND prediction_type = ?
-                """,
-                    (user_email, prediction_type),
-                )
-
-                row = cursor.fetchone()
-                assert row is not None
-                assert row["predicted_value"] == predicted_value
-                assert row["actual_value"] == actual_value
-                assert row["prediction_date"] == prediction_date
-                assert row["actual_date"] == actual_date
-                # Accuracy score should be calculated correctly
-                expected_accuracy = 1 - abs(predicted_value - actual_value) / max(
-                    abs(actual_value), 1
-                )
-                assert abs(row["accuracy_score"] - expected_accuracy) < 0.001
+            row = cursor.fetchone()
+            assert row is not None
+            assert (
+                row["predicted_value"],
+                row["actual_value"],
+                row["prediction_date"],
+                row["actual_date"],
+            ) == (predicted_value, actual_value, prediction_date, actual_date)
+            # Accuracy score should be calculated correctly
+            expected_accuracy = 1 - abs(predicted_value - actual_value) / max(
+                abs(actual_value), 1
+            )
+            assert abs(row["accuracy_score"] - expected_accuracy) < 0.001
 
     def test_log_prediction_accuracy_with_default_actual_date(
         self, temp_db, prediction_service
     ):
         """Test logging accuracy with default actual date (now)"""
-        with patch("app.db.DATABASE_PATH", temp_db):
-            user_email = "test@example.com"
-            prediction_type = "weight_change"
-            predicted_value = 75.0
-            actual_value = 74.5
-            prediction_date = "2024-01-01T10:00:00"
-
-            # Log without actual_date (should default to now)
-            result = prediction_service.log_prediction_accuracy(
-                user_email,
-                prediction_type,
-                predicted_value,
-                actual_value,
-                prediction_date,
+        user_email = "test@example.com"
+        prediction_type = "weight_change"
+        predicted_value = 75.0
+        actual_value = 74.5
+        prediction_date = PREDICTION_DATE
+
+        # Log without actual_date (should default to now)
+        result = prediction_service.log_prediction_accuracy(
+            user_email,
+            prediction_type,
+            predicted_value,
+            actual_value,
+            prediction_date,
+        )
+
+        assert result is True
+
+        # Verify actual_date was set to approximately now
+        with self._open_db(temp_db) as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT actual_date FROM prediction_accuracy 
+                WHERE user_email = ? AND prediction_type = ?
+            """,
+                (user_email, prediction_type),
             )
 
-            assert result is True
-
-            # Verify actual_date was set to approximately now
-            with sqlite3.connect(temp_db) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                cursor.execute(
-                    """
-                    SELECT actual_date FROM prediction_accuracy 
-                    WHERE user_email = ? AND prediction_type = ?
-                """,
-                    (user_email, prediction_type),
-                )
-
-                row = cursor.fetchone()
-                actual_date = datetime.fromisoformat(row["actual_date"])
-                now = datetime.now()
-                # Should be within 1 second of now
-                assert abs((actual_date - now).total_seconds()) < 1
+            row = cursor.fetchone()
+            actual_date = datetime.fromisoformat(row["actual_date"])
+            now = datetime.now()
+            # Should be within 1 second of now
+            assert abs((actual_date - now).total_seconds()) < 1
 
     def test_get_prediction_accuracy_stats(self, temp_db, prediction_service):
         """Test retrieving prediction accuracy statistics"""
-        with patch("app.db.DATABASE_PATH", temp_db):
-            user_email = "test@example.com"
-
-            # Insert test data
-            test_data = [
-                ("workout_performance", 85.0, 90.0),
-                ("workout_performance", 75.0, 70.0),
-                ("weight_change", 2.0, 1.8),
-                ("weight_change", -1.0, -1.2),
-            ]
-
-            for pred_type, pred_val, actual_val in test_data:
-                prediction_service.log_prediction_accuracy(
-                    user_email, pred_type, pred_val, actual_val, "2024-01-01T10:00:00"
-                )
+        user_email = "test@example.com"
 
-            # Test getting stats for all prediction types
-            stats = prediction_service.get_prediction_accuracy_stats(user_email)
+        # Insert test data
+        for pred_type, pred_val, actual_val in STATS_ROWS:
+            prediction_service.log_prediction_accuracy(
+                user_email, pred_type, pred_val, actual_val, PREDICTION_DATE
+            )
 
-            assert stats["total_predictions"] == 4
-            assert stats["average_accuracy"] > 0
-            assert stats["min_accuracy"] >= 0
-            assert stats["max_accuracy"] <= 1
+        # Test getting stats for all prediction types
+        stats = prediction_service.get_prediction_accuracy_stats(user_email)
 
-            # Test getting stats for specific prediction type
-            workout_stats = prediction_service.get_prediction_accuracy_stats(
-                user_email, "workout_performance"
-            )
+        assert stats["total_predictions"] == 4
+        assert stats["average_accuracy"] > 0
+        assert stats["min_accuracy"] >= 0
+        assert stats["max_accuracy"] <= 1
+
+        # Test getting stats for specific prediction type
+        workout_stats = prediction_service.get_prediction_accuracy_stats(
+            user_email, "workout_performance"
+        )
 
-            assert workout_stats["total_predictions"] == 2
+        assert workout_stats["total_predictions"] == 2
 
     def test_get_recent_prediction_accuracy(self, temp_db, prediction_service):
         """Test retrieving recent prediction accuracy records"""
-        with patch("app.db.DATABASE_PATH", temp_db):
-            user_email = "test@example.com"
+        user_email = "test@example.com"
 
-            # Insert test data with different dates
-            now = datetime.now()
-            recent_date = (now - timedelta(days=5)).isoformat()
-            old_date = (now - timedelta(days=35)).isoformat()
+        # Insert test data with different dates
+        recent_date = (NOW - timedelta(days=5)).isoformat()
+        old_date = (NOW - timedelta(days=35)).isoformat()
 
-            # Recent prediction
-            prediction_service.log_prediction_accuracy(
-                user_email, "workout_performance", 85.0, 90.0, recent_date, recent_date
-            )
+        # Recent prediction
+        prediction_service.log_prediction_accuracy(
+            user_email, "workout_performance", 85.0, 90.0, recent_date, recent_date
+        )
 
-            # Old prediction (should not be included in 30-day window)
-            prediction_service.log_prediction_accuracy(
-                user_email, "workout_performance", 75.0, 70.0, old_date, old_date
-            )
+        # Old prediction (should not be included in 30-day window)
+        prediction_service.log_prediction_accuracy(
+            user_email, "workout_performance", 75.0, 70.0, old_date, old_date
+        )
 
-            # Get recent records (30 days)
-            recent_records = prediction_service.get_recent_prediction_accuracy(
-                user_email, days=30
-            )
+        # Get recent records (30 days)
+        recent_records = prediction_service.get_recent_prediction_accuracy(
+            user_email, days=30
+        )
 
-            assert len(recent_records) == 1
-            assert recent_records[0]["predicted_value"] == 85.0
-            assert recent_records[0]["actual_value"] == 90.0
-            assert "error_magnitude" in recent_records[0]
-            assert recent_records[0]["error_magnitude"] == 5.0
+        assert len(recent_records) == 1
+        assert recent_records[0]["predicted_value"] == 85.0
+        assert recent_records[0]["actual_value"] == 90.0
+        assert "error_magnitude" in recent_records[0]
+        assert recent_records[0]["error_magnitude"] == 5.0
 
     def test_calculate_accuracy_trends(self, temp_db, prediction_service):
         """Test calculation of accuracy trends over time"""
-        with patch("app.db.DATABASE_PATH", temp_db):
-            user_email = "test@example.com"
-
-            # Insert test data with improving accuracy over time
-            base_date = datetime.now() - timedelta(days=20)
-
-            # Older predictions (lower accuracy)
-            for i in range(5):
-                date = (base_date + timedelta(days=i)).isoformat()
-                prediction_service.log_prediction_accuracy(
+        user_email = "test@example.com"
+
+        # Insert test data with improving accuracy over time: five older
+        # predictions (low accuracy), then five recent ones (high accuracy)
+        base_date = NOW - timedelta(days=20)
+        rows = []
+        for i in range(10):
+            date = (base_date + timedelta(days=i)).isoformat()
+            actual_value = 70.0 if i < 5 else 95.0
+            accuracy_score = 1 - abs(100.0 - actual_value) / actual_value
+            rows.append(
+                (
                     user_email,
                     "workout_performance",
                     100.0,
-                    70.0,  # Low accuracy
+                    actual_value,
                     date,
                     date,
+                    accuracy_score,
                 )
+            )
 
-            # Recent predictions (higher accuracy)
-            for i in range(5, 10):
-                date = (base_date + timedelta(days=i)).isoformat()
-                prediction_service.log_prediction_accuracy(
-                    user_email,
-                    "workout_performance",
-                    100.0,
-                    95.0,  # High accuracy
-                    date,
-                    date,
+        # One prepared statement, one transaction
+        with self._open_db(temp_db) as conn:
+            with conn:
+                conn.executemany(
+                    """
+                    INSERT INTO prediction_accuracy
+                        (user_email, prediction_type, predicted_value,
+                         actual_value, prediction_date, actual_date,
+                         accuracy_score)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                    rows,
                 )
 
-            # Calculate trends
-            trends = prediction_service.calculate_accuracy_trends(
-                user_email, "workout_performance"
-            )
-
-            assert "trend" in trends
-            assert trends["trend"] in [
-                "improving",
-                "declining",
-                "stable",
-                "insufficient_data",
-            ]
-            assert "recent_average_accuracy" in trends
-            assert "older_average_accuracy" in trends
-            assert "total_predictions" in trends
-            assert trends["total_predictions"] == 10
+        # Calculate trends
+        trends = prediction_service.calculate_accuracy_trends(
+            user_email, "workout_performance"
+        )
+
+        assert {
+            "trend",
+            "recent_average_accuracy",
+            "older_average_accuracy",
+            "total_predictions",
+        } <= trends.keys()
+        assert trends["trend"] in {
+            "improving",
+            "declining",
+            "stable",
+            "insufficient_data",
+        }
+        assert trends["total_predictions"] == 10
 
     def test_get_prediction_type_performance(self, temp_db, prediction_service):
         """Test getting performance breakdown by prediction type"""
-        with patch("app.db.DATABASE_PATH", temp_db):
-            user_email = "test@example.com"
-
-            # Insert test data for different prediction types
-            test_data = [
-                ("workout_performance", 85.0, 90.0),
-                ("workout_performance", 75.0, 80.0),
-                ("weight_change", 2.0, 2.1),
-                ("macro_target", 150.0, 145.0),
-            ]
-
-            for pred_type, pred_val, actual_val in test_data:
-                prediction_service.log_prediction_accuracy(
-                    user_email, pred_type, pred_val, actual_val, "2024-01-01T10:00:00"
-                )
+        user_email = "test@example.com"
+
+        # Insert test data for different prediction types
+        for pred_type, pred_val, actual_val in TYPE_PERFORMANCE_ROWS:
+            prediction_service.log_prediction_accuracy(
+                user_email, pred_type, pred_val, actual_val, PREDICTION_DATE
+            )
 
-            # Get performance by type
-            performance = prediction_service.get_prediction_type_performance(user_email)
+        # Get performance by type
+        performance = prediction_service.get_prediction_type_performance(user_email)
 
-            assert "workout_performance" in performance
-            assert "weight_change" in performance
-            assert "macro_target" in performance
+        assert {row[0] for row in TYPE_PERFORMANCE_ROWS} <= performance.keys()
 
-            # Check workout_performance stats
-            workout_perf = performance["workout_performance"]
-            assert workout_perf["total_predictions"] == 2
-            assert "average_accuracy" in workout_perf
-            assert "reliability_score" in workout_perf
-            assert workout_perf["reliability_score"] <= 1.0
+        # Check workout_performance stats
+        workout_perf = performance["workout_performance"]
+        assert workout_perf["total_predictions"] == 2
+        assert {"average_accuracy", "reliability_score"} <= workout_perf.keys()
+        assert workout_perf["reliability_score"] <= 1.0
 
     def test_calculate_reliability_score(self, prediction_service):
         """Test the reliability score calculation"""
@@ -309,31 +320,29 @@ class TestPredictionAccuracyTracking:
 
     def test_accuracy_calculation_edge_cases(self, temp_db, prediction_service):
         """Test accuracy calculation with edge cases"""
-        with patch("app.db.DATABASE_PATH", temp_db):
-            user_email = "test@example.com"
+        user_email = "test@example.com"
 
-            # Test with zero actual value
-            prediction_service.log_prediction_accuracy(
-                user_email, "test_type", 5.0, 0.0, "2024-01-01T10:00:00"
-            )
+        # Test with zero actual value
+        prediction_service.log_prediction_accuracy(
+            user_email, "test_type", 5.0, 0.0, PREDICTION_DATE
+        )
 
-            # Test with negative values
-            prediction_service.log_prediction_accuracy(
-                user_email, "test_type", -10.0, -8.0, "2024-01-01T10:00:00"
-            )
+        # Test with negative values
+        prediction_service.log_prediction_accuracy(
+            user_email, "test_type", -10.0, -8.0, PREDICTION_DATE
+        )
 
-            # Test with very close values (high accuracy)
-            prediction_service.log_prediction_accuracy(
-                user_email, "test_type", 100.0, 100.1, "2024-01-01T10:00:00"
-            )
+        # Test with very close values (high accuracy)
+        prediction_service.log_prediction_accuracy(
+            user_email, "test_type", 100.0, 100.1, PREDICTION_DATE
+        )
 
-            # Verify all were logged successfully
-            stats = prediction_service.get_prediction_accuracy_stats(
-                user_email, "test_type"
-            )
-            assert stats["total_predictions"] == 3
-            assert stats["average_accuracy"] >= 0
-            assert stats["average_accuracy"] <= 1
+        # Verify all were logged successfully
+        stats = prediction_service.get_prediction_accuracy_stats(
+            user_email, "test_type"
+        )
+        assert stats["total_predictions"] == 3
+        assert 0 <= stats["average_accuracy"] <= 1
 
 
 class TestPredictionAccuracyAPI:
@@ -361,17 +370,17 @@ class TestPredictionAccuracyAPI:
 
     def test_date_validation(self):
         """Test date format validation"""
-        valid_dates = [
+        valid_dates = (
             "2024-01-01T10:00:00",
             "2024-12-31T23:59:59",
             "2024-06-15T12:30:45",
-        ]
+        )
 
-        invalid_dates = [
+        invalid_dates = (
             "invalid-date",
             "2024-13-01T10:00:00",  # Invalid month
             "not-a-date-at-all",
-        ]
+        )
 
         for date_str in valid_dates:
             try:
@@ -392,27 +401,27 @@ class TestPredictionAccuracyAPI:
 
 def test_database_integration():
     """Test that the database operations work correctly"""
-    # Create a temporary database for testing
-    db_fd, db_path = tempfile.mkstemp()
-    os.close(db_fd)
+    # Shared-cache memory database: nothing is journaled or fsynced, and it
+    # disappears with the last connection, so there is no file to clean up
+    db_path = f"file:pa_{uuid.uuid4().hex}?mode=memory&cache=shared"
+    keeper = sqlite3.connect(db_path, uri=True)
 
     try:
         # Create the prediction_accuracy table
-        with sqlite3.connect(db_path) as conn:
-            conn.execute("""
-                CREATE TABLE prediction_accuracy (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_email TEXT NOT NULL,
-                    prediction_type TEXT NOT NULL,
-                    predicted_value REAL NOT NULL,
-                    actual_value REAL NOT NULL,
-                    prediction_date TIMESTAMP NOT NULL,
-                    actual_date TIMESTAMP NOT NULL,
-                    accuracy_score REAL NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            conn.commit()
+        keeper.execute("""
+            CREATE TABLE prediction_accuracy (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_email TEXT NOT NULL,
+                prediction_type TEXT NOT NULL,
+                predicted_value REAL NOT NULL,
+                actual_value REAL NOT NULL,
+                prediction_date TIMESTAMP NOT NULL,
+                actual_date TIMESTAMP NOT NULL,
+                accuracy_score REAL NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        keeper.commit()
 
         # Test the AnalyticsDB methods with our temp database
         with patch("app.db.DATABASE_PATH", db_path):
@@ -422,8 +431,8 @@ def test_database_integration():
                 "workout_performance",
                 85.0,
                 90.0,
-                "2024-01-01T10:00:00",
-                "2024-01-02T15:00:00",
+                PREDICTION_DATE,
+                ACTUAL_DATE,
             )
             assert result is True
 
@@ -433,13 +442,7 @@ def test_database_integration():
             assert stats["average_accuracy"] > 0
 
     finally:
-        # Clean up - handle Windows file locking issues
-        try:
-            os.unlink(db_path)
-        except (PermissionError, FileNotFoundError):
-            # On Windows, files might be locked by SQLite connections
-            # This is acceptable for test cleanup
-            pass
+        keeper.close()
 
 
 if __name__ == "__main__":
@@ -13,12 +13,15 @@ def test_prediction_service_methods():
     service = PredictionService()
 
     # Test method existence
-    assert hasattr(service, "log_prediction_accuracy")
-    assert hasattr(service, "get_prediction_accuracy_stats")
-    assert hasattr(service, "get_recent_prediction_accuracy")
-    assert hasattr(service, "calculate_accuracy_trends")
-    assert hasattr(service, "get_prediction_type_performance")
-    assert hasattr(service, "_calculate_reliability_score")
+    required = {
+        "log_prediction_accuracy",
+        "get_prediction_accuracy_stats",
+        "get_recent_prediction_accuracy",
+        "calculate_accuracy_trends",
+        "get_prediction_type_performance",
+        "_calculate_reliability_score",
+    }
+    assert required <= set(dir(service)), required - set(dir(service))
 
     # Test method signatures (basic call without database)
     try:
@@ -114,10 +117,12 @@ def test_prediction_types_validation():
 
     # These should be the types accepted by the API
     assert len(valid_types) == 4
-    assert "workout_performance" in valid_types
-    assert "weight_change" in valid_types
-    assert "macro_target" in valid_types
-    assert "performance_forecast" in valid_types
+    assert {
+        "workout_performance",
+        "weight_change",
+        "macro_target",
+        "performance_forecast",
+    } <= set(valid_types)
 
     # Invalid types should not be in the list
     invalid_types = ["invalid_type", "random_prediction", ""]
@@ -7,113 +7,67 @@ import unittest
 
 from app.predictions import PredictionService
 
+# Shared, read-only fixture values used across both test classes
+TEST_EMAIL = "test@example.com"
+PREDICTION_DATE = "2024-01-01T00:00:00"
+
 
 class TestRecommendationEngine(unittest.TestCase):
     """Test cases for recommendation engine functionality"""
 
-    def setUp(self):
-        """Set up test environment"""
-        self.prediction_service = PredictionService()
+    @classmethod
+    def setUpClass(cls):
+        """Set up test environment (PredictionService is stateless, share one)"""
+        cls.prediction_service = PredictionService()
 
-    def test_recommend_macro_targets_maintenance_goal(self):
-        """Test macro recommendations for maintenance goal"""
-        # Test that the method exists and returns expected type
-        recommendation = self.prediction_service.recommend_macro_targets(
-            "test@example.com", "maintenance"
-        )
-
-        # Current implementation returns None, which is expected for insufficient data
-        self.assertIsNone(recommendation)
+    def test_recommend_macro_targets_by_goal(self):
+        """Test macro recommendations for each supported goal"""
+        for goal in ("maintenance", "cutting", "bulking"):
+            with self.subTest(goal=goal):
+                # Test that the method exists and returns expected type
+                recommendation = self.prediction_service.recommend_macro_targets(
+                    TEST_EMAIL, goal
+                )
 
-    def test_recommend_macro_targets_cutting_goal(self):
-        """Test macro recommendations for cutting goal"""
-        # Test that the method exists and returns expected type
-        recommendation = self.prediction_service.recommend_macro_targets(
-            "test@example.com", "cutting"
-        )
-
-        # Current implementation returns None, which is expected for insufficient data
-        self.assertIsNone(recommendation)
-
-    def test_recommend_macro_targets_bulking_goal(self):
-        """Test macro recommendations for bulking goal"""
-        # Test that the method exists and returns expected type
-        recommendation = self.prediction_service.recommend_macro_targets(
-            "test@example.com", "bulking"
-        )
-
-        # Current implementation returns None, which is expected for insufficient data
-        self.assertIsNone(recommendation)
+                # Current implementation returns None, which is expected for insufficient data
+                self.assertIsNone(recommendation)
 
     def test_recommend_macro_targets_insufficient_data(self):
         """Test macro recommendations with insufficient data"""
         recommendation = self.prediction_service.recommend_macro_targets(
-            "test@example.com", "maintenance"
+            TEST_EMAIL, "maintenance"
         )
 
         # Current implementation returns None, which is expected for insufficient data
         self.assertIsNone(recommendation)
 
-    def test_generate_intervention_suggestions_declining_performance(self):
-        """Test intervention suggestions for declining performance"""
+    def test_generate_intervention_suggestions(self):
+        """Test intervention suggestions"""
         suggestions = self.prediction_service.generate_intervention_suggestions(
-            "test@example.com"
+            TEST_EMAIL
         )
 
         # Current implementation returns empty list
         self.assertIsInstance(suggestions, list)
 
-    def test_generate_intervention_suggestions_stable_trends(self):
-        """Test intervention suggestions for stable trends"""
-        suggestions = self.prediction_service.generate_intervention_suggestions(
-            "test@example.com"
-        )
-
-        # Current implementation returns empty list
-        self.assertIsInstance(suggestions, list)
-
-    def test_generate_intervention_suggestions_rapid_weight_gain(self):
-        """Test intervention suggestions for rapid weight gain"""
-        suggestions = self.prediction_service.generate_intervention_suggestions(
-            "test@example.com"
-        )
-
-        # Current implementation returns empty list
-        self.assertIsInstance(suggestions, list)
-
-    def test_calculate_prediction_confidence_with_history(self):
-        """Test prediction confidence calculation with historical accuracy"""
+    def test_calculate_prediction_confidence(self):
+        """Test prediction confidence with and without historical accuracy"""
+        # No accuracy history: should return default moderate confidence
         confidence = self.prediction_service.calculate_prediction_confidence(
-            "test@example.com", "workout_performance"
+            TEST_EMAIL, "workout_performance"
         )
-
-        self.assertIsInstance(confidence, float)
-        self.assertGreaterEqual(confidence, 0.0)
-        self.assertLessEqual(confidence, 1.0)
-
-    def test_calculate_prediction_confidence_no_history(self):
-        """Test prediction confidence calculation with no historical data"""
-        confidence = self.prediction_service.calculate_prediction_confidence(
-            "test@example.com", "workout_performance"
-        )
-
-        # Should return default moderate confidence
         self.assertEqual(confidence, 0.5)
 
-    def test_calculate_prediction_confidence_limited_history(self):
-        """Test prediction confidence calculation with limited historical data"""
         confidence = self.prediction_service.calculate_prediction_confidence(
-            "test@example.com", "macro_targets"
+            TEST_EMAIL, "macro_targets"
         )
-
         self.assertIsInstance(confidence, float)
-        self.assertGreaterEqual(confidence, 0.0)
-        self.assertLessEqual(confidence, 1.0)
+        self.assertTrue(0.0 <= confidence <= 1.0, confidence)
 
     def test_predict_workout_performance(self):
         """Test workout performance prediction"""
         prediction = self.prediction_service.predict_workout_performance(
-            "test@example.com", "general"
+            TEST_EMAIL, "general"
         )
 
         # Current implementation returns None for insufficient data
@@ -122,11 +76,11 @@ class TestRecommendationEngine(unittest.TestCase):
     def test_log_prediction_accuracy(self):
         """Test logging prediction accuracy"""
         result = self.prediction_service.log_prediction_accuracy(
-            "test@example.com",
+            TEST_EMAIL,
             "workout_performance",
             100.0,
             95.0,
-            "2024-01-01T00:00:00",
+            PREDICTION_DATE,
         )
 
         # Should return a boolean
@@ -134,9 +88,7 @@ class TestRecommendationEngine(unittest.TestCase):
 
     def test_get_prediction_accuracy_stats(self):
         """Test getting prediction accuracy statistics"""
-        stats = self.prediction_service.get_prediction_accuracy_stats(
-            "test@example.com"
-        )
+        stats = self.prediction_service.get_prediction_accuracy_stats(TEST_EMAIL)
 
         # Should return a dictionary
         self.assertIsInstance(stats, dict)
@@ -145,15 +97,16 @@ class TestRecommendationEngine(unittest.TestCase):
 class TestPredictionServiceIntegration(unittest.TestCase):
     """Integration tests for prediction service with full workflow"""
 
-    def setUp(self):
-        """Set up test environment"""
-        self.prediction_service = PredictionService()
+    @classmethod
+    def setUpClass(cls):
+        """Set up test environment (PredictionService is stateless, share one)"""
+        cls.prediction_service = PredictionService()
 
     def test_predict_workout_performance_full_workflow(self):
         """Test complete workout performance prediction workflow"""
         # Test basic functionality
         prediction = self.prediction_service.predict_workout_performance(
-            "test@example.com", "bench_press"
+            TEST_EMAIL, "bench_press"
         )
 
         # Current implementation returns None for insufficient data
@@ -162,7 +115,7 @@ class TestPredictionServiceIntegration(unittest.TestCase):
     def test_predict_workout_performance_insufficient_data(self):
         """Test workout performance prediction with insufficient data"""
         prediction = self.prediction_service.predict_workout_performance(
-            "test@example.com", "bench_press"
+            TEST_EMAIL, "bench_press"
         )
 
         # Should return None due to insufficient data
@@ -0,0 +1,77 @@
+"""
+Shared fixtures for the API tests: an isolated, fully migrated database and
+a TestClient authenticated as TEST_EMAIL
+"""
+
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import db, db_pool, queries
+from app.auth import get_current_user
+from app.main import app
+from run_migrations import run_all_migrations
+
+TEST_EMAIL = "api_test@example.com"
+
+# Tables the app expects before migrations run (see scripts/init_db.py)
+BASE_SCHEMA = """
+    CREATE TABLE users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        email TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL
+    );
+    CREATE TABLE foods (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        calories REAL,
+        protein REAL,
+        carbs REAL,
+        fat REAL,
+        fiber REAL,
+        sugar REAL,
+        user_email TEXT NOT NULL,
+        date TEXT NOT NULL
+    );
+    CREATE TABLE weights (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_email TEXT NOT NULL,
+        date TEXT NOT NULL,
+        weight REAL NOT NULL
+    );
+    CREATE TABLE workouts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_email TEXT NOT NULL,
+        date TEXT NOT NULL,
+        name TEXT NOT NULL
+    );
+"""
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """Path of a fresh, migrated database that the app and pool point at"""
+    path = str(tmp_path / "ascend.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(BASE_SCHEMA)
+    conn.close()
+    assert run_all_migrations(path)
+
+    # Pooled connections and per-process caches may belong to another database
+    db_pool.close_all()
+    queries._macros_cache.clear()
+    monkeypatch.setattr(db_pool, "DB_NAME", path)
+    monkeypatch.setattr(db, "DATABASE_PATH", path)
+    yield path
+    db_pool.close_all()
+
+
+@pytest.fixture
+def client(db_path):
+    """TestClient whose requests are authenticated as TEST_EMAIL"""
+    app.dependency_overrides[get_current_user] = lambda: TEST_EMAIL
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
@@ -0,0 +1,27 @@
+"""
+Tests for GET /analytics/bundle
+"""
+
+from app import main
+
+BUNDLE_ENDPOINTS = {"trends", "predictions", "recommendations", "insights"}
+
+
+def test_bundle_matches_standalone_endpoints(client):
+    """Each entry carries the standalone endpoint's status code and body"""
+    bundle = client.get("/analytics/bundle").json()
+    assert bundle.keys() == BUNDLE_ENDPOINTS
+
+    for name, part in bundle.items():
+        r = client.get(f"/analytics/{name}")
+        assert part == {"status": r.status_code, "body": r.json()}
+
+
+def test_bundle_wraps_plain_results(client, monkeypatch):
+    """A result that is not a Response is wrapped as a 200 with its JSON body"""
+    monkeypatch.setattr(
+        main, "get_analytics_trends", lambda days, user_email: {"days": days}
+    )
+
+    part = client.get("/analytics/bundle?days=14").json()["trends"]
+    assert part == {"status": 200, "body": {"days": 14}}
@@ -0,0 +1,87 @@
+"""
+Tests for the trigger-maintained daily_macros rollup and the endpoints that
+read it
+"""
+
+import sqlite3
+
+import pytest
+
+from app.db import today_iso
+from conftest import TEST_EMAIL
+
+MACROS = ("calories", "protein", "carbs", "fat", "fiber", "sugar")
+
+
+def _food(name, calories, protein):
+    return {
+        "name": name,
+        "calories": calories,
+        "protein": protein,
+        "carbs": 10,
+        "fat": 5,
+        "fiber": 2,
+        "sugar": 1,
+    }
+
+
+def _totals(db_path, date):
+    """(rollup totals, SUM(foods) totals) for TEST_EMAIL on date"""
+    columns = ", ".join(f"COALESCE(MAX({m}), 0)" for m in MACROS)
+    sums = ", ".join(f"COALESCE(SUM({m}), 0)" for m in MACROS)
+    conn = sqlite3.connect(db_path)
+    try:
+        params = (TEST_EMAIL, date)
+        where = "WHERE user_email = ? AND date = ?"
+        rollup = conn.execute(f"SELECT {columns} FROM daily_macros {where}", params)
+        foods = conn.execute(f"SELECT {sums} FROM foods {where}", params)
+        return rollup.fetchone(), foods.fetchone()
+    finally:
+        conn.close()
+
+
+def test_rollup_matches_foods_after_each_write(client, db_path):
+    """daily_macros equals SUM(foods) after insert, update and delete"""
+    today = today_iso()
+
+    # Insert
+    first_id = client.post("/foods", json=_food("Eggs", 150, 12)).json()["id"]
+    client.post("/foods", json=_food("Toast", 80, 3))
+    rollup, foods = _totals(db_path, today)
+    assert rollup == pytest.approx(foods)
+    assert rollup[0] == pytest.approx(230)
+
+    # Update, including moving a row to another day
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE foods SET protein = protein + 10 WHERE id = ?", (first_id,))
+    conn.execute(
+        "UPDATE foods SET date = '2024-01-01' WHERE id != ? AND user_email = ?",
+        (first_id, TEST_EMAIL),
+    )
+    conn.commit()
+    conn.close()
+    for date in (today, "2024-01-01"):
+        rollup, foods = _totals(db_path, date)
+        assert rollup == pytest.approx(foods)
+    assert _totals(db_path, today)[0][:2] == pytest.approx((150, 22))
+
+    # Delete
+    client.delete(f"/foods/{first_id}")
+    rollup, foods = _totals(db_path, today)
+    assert rollup == pytest.approx(foods)
+    assert rollup == pytest.approx((0,) * len(MACROS))
+
+
+def test_daily_endpoints_read_the_rollup(client):
+    """/daily_macros and /summary report today's totals"""
+    client.post("/foods", json=_food("Eggs", 150, 12))
+    client.post("/foods", json=_food("Toast", 80, 3))
+
+    macros = client.get("/daily_macros").json()
+    assert macros["calories"] == pytest.approx(230)
+    assert macros["protein"] == pytest.approx(15)
+    assert macros["fats"] == pytest.approx(10)
+
+    summary = client.get("/summary").json()
+    assert summary["calories"] == pytest.approx(230)
+    assert summary["fiber"] == pytest.approx(4)
@@ -0,0 +1,35 @@
+"""
+Tests for the bulk CSV food import (queries.bulk_insert_foods)
+"""
+
+import csv
+import io
+
+from app import queries
+from conftest import TEST_EMAIL
+
+CSV_TEXT = """name,calories,protein,carbs,fat,fiber,sugar,date
+Oats,380,13,67,7,8,1,2024-01-01
+Milk,60,,5,3,0,5,2024-01-01
+Rice,130,abc,28,0,0,0,2024-01-01
+Apple,95,0.5,25,0.3,4,19,
+"""
+
+
+def test_bulk_insert_skips_invalid_rows(client):
+    """Blank and non-numeric macro cells are skipped, not stored"""
+    rows = csv.DictReader(io.StringIO(CSV_TEXT))
+    inserted, skipped = queries.bulk_insert_foods(
+        TEST_EMAIL, rows, default_date="2024-01-02"
+    )
+    assert (inserted, skipped) == (2, 2)
+
+    # Every stored row still validates, so the list endpoint keeps working
+    r = client.get("/foods")
+    assert r.status_code == 200
+    foods = {food["name"]: food for food in r.json()}
+    assert foods.keys() == {"Oats", "Apple"}
+    assert foods["Oats"]["protein"] == 13.0
+
+    # A row without a date is logged for the default date
+    assert queries.get_summary(TEST_EMAIL, "2024-01-02")["calories"] == 95.0
@@ -0,0 +1,62 @@
+"""
+Tests for GET /foods and its conditional (ETag) requests
+"""
+
+import sqlite3
+
+from conftest import TEST_EMAIL
+
+OATS = {
+    "name": "Oats",
+    "calories": 380,
+    "protein": 13,
+    "carbs": 67,
+    "fat": 7,
+    "fiber": 8,
+    "sugar": 1,
+}
+
+
+def test_list_foods_returns_null_macros(client, db_path):
+    """Rows stored with NULL macros are listed as null, not rejected"""
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "INSERT INTO foods (name, calories, user_email, date) VALUES (?, ?, ?, ?)",
+        ("Legacy entry", 120.0, TEST_EMAIL, "2024-01-01"),
+    )
+    conn.commit()
+    conn.close()
+
+    r = client.get("/foods")
+    assert r.status_code == 200
+    [food] = r.json()
+    assert food["name"] == "Legacy entry"
+    assert food["calories"] == 120.0
+    assert food["protein"] is None
+
+
+def test_list_foods_etag(client):
+    """A matching If-None-Match gets a 304; inserts and deletes change the ETag"""
+    etag = client.get("/foods").headers["ETag"]
+
+    r = client.get("/foods", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.headers["ETag"] == etag
+    assert r.content == b""
+
+    first_id = client.post("/foods", json=OATS).json()["id"]
+    client.post("/foods", json=OATS)
+    inserted_etag = client.get("/foods").headers["ETag"]
+    assert inserted_etag != etag
+
+    # The client's old version no longer matches, so it gets the full list
+    r = client.get("/foods", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert len(r.json()) == 2
+
+    client.delete(f"/foods/{first_id}")
+    deleted_etag = client.get("/foods").headers["ETag"]
+    assert deleted_etag not in (etag, inserted_etag)
+    assert (
+        client.get("/foods", headers={"If-None-Match": deleted_etag}).status_code == 304
+    )
@@ -0,0 +1,106 @@
+"""
+Tests for the all-or-nothing migration runner (run_migrations.py)
+"""
+
+import importlib
+import sqlite3
+
+from conftest import BASE_SCHEMA
+from run_migrations import run_all_migrations
+
+
+def _schema_names(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+    finally:
+        conn.close()
+
+
+def test_failing_migration_rolls_back_all(tmp_path, monkeypatch):
+    """A failure in the last migration undoes the ones before it"""
+    db_path = str(tmp_path / "ascend.db")
+    conn = sqlite3.connect(db_path)
+    conn.executescript(BASE_SCHEMA)
+    conn.close()
+    before = _schema_names(db_path)
+
+    def fail(db_path, conn=None):
+        raise RuntimeError("simulated migration failure")
+
+    last = importlib.import_module("migrations.006_add_daily_macros_rollup")
+    monkeypatch.setattr(last, "run_migration", fail)
+
+    assert run_all_migrations(db_path) is False
+    # Nothing from 001-004 (tables, indexes) survived the rollback
+    assert _schema_names(db_path) == before
+
+
+# scripts/init_db.py before foods carried user_email/date
+OLD_SCHEMA = """
+    CREATE TABLE users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        email TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL
+    );
+    CREATE TABLE foods (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        calories REAL,
+        protein REAL,
+        carbs REAL,
+        fat REAL,
+        fiber REAL,
+        sugar REAL
+    );
+    CREATE TABLE meals (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        timestamp TEXT,
+        FOREIGN KEY(user_id) REFERENCES users(id)
+    );
+    CREATE TABLE meal_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        meal_id INTEGER,
+        food_id INTEGER,
+        quantity REAL,
+        FOREIGN KEY(meal_id) REFERENCES meals(id),
+        FOREIGN KEY(food_id) REFERENCES foods(id)
+    );
+    INSERT INTO users (id, email, password) VALUES (1, 'old@example.com', 'x');
+    INSERT INTO foods (id, name, calories, protein, carbs, fat, fiber, sugar)
+    VALUES (1, 'Oats', 380, 13, 67, 7, 8, 1),
+           (2, 'Orphan', 100, 1, 1, 1, 0, 0);
+    INSERT INTO meals (id, user_id, timestamp) VALUES (1, 1, '2024-01-05T08:30:00');
+    INSERT INTO meal_items (meal_id, food_id, quantity) VALUES (1, 1, 1.0);
+"""
+
+
+def test_migrates_old_foods_schema(tmp_path):
+    """An old database gains foods.user_email/date, backfilled from meals"""
+    db_path = str(tmp_path / "ascend.db")
+    conn = sqlite3.connect(db_path)
+    conn.executescript(OLD_SCHEMA)
+    conn.close()
+
+    assert run_all_migrations(db_path) is True
+
+    conn = sqlite3.connect(db_path)
+    try:
+        foods = {
+            row[0]: row[1:]
+            for row in conn.execute("SELECT name, user_email, date FROM foods")
+        }
+        rollup = conn.execute(
+            "SELECT user_email, date, calories FROM daily_macros"
+        ).fetchall()
+    finally:
+        conn.close()
+
+    assert foods == {
+        "Oats": ("old@example.com", "2024-01-05"),
+        # Not in any meal, so there is nothing to recover
+        "Orphan": (None, None),
+    }
+    assert rollup == [("old@example.com", "2024-01-05", 380.0)]
+    assert "idx_foods_user_date_macros" in _schema_names(db_path)